@@ -0,0 +1,190 @@
+"""Microbenchmark: legacy CDN URL collection vs the memoized scanner.
+
+Pass saved Facebook desktop pages to measure real HTML; without arguments a
+synthetic page with a similar mix of JSON "uri" strings and bare CDN URLs
+is generated. Run from the repository root:
+    python -m benchmarks.facebook_images [saved_page.html ...]
+"""
+import json
+import random
+import re
+import sys
+import timeit
+from typing import Dict, List, Optional, Sequence
+
+from module import facebook_image
+from module.facebook_image import (
+    _collect_post_images_from_html,
+    _content_dimensions,
+    _decode_json_string,
+    _dedupe_images,
+    _extract_images_from_regex,
+    _find_url_position,
+    _is_compact_gallery_layout,
+    _normalize_cdn_url,
+)
+
+# The uncached helpers, so the legacy path pays for classification as it used to
+legacy_is_post_image = facebook_image._is_post_image.__wrapped__
+legacy_file_id = facebook_image._facebook_file_id.__wrapped__
+legacy_dimensions = _content_dimensions.__wrapped__
+
+
+def legacy_is_better(candidate: str, current: str) -> bool:
+    candidate_dims = legacy_dimensions(candidate)
+    current_dims = legacy_dimensions(current)
+    candidate_max = max(candidate_dims) if candidate_dims else 0
+    current_max = max(current_dims) if current_dims else 0
+    if candidate_max != current_max:
+        return candidate_max > current_max
+    return len(candidate) > len(current)
+
+
+def legacy_register(url: str, position: int, best_url: Dict[str, str], first_pos: Dict[str, int], counts: Dict[str, int]) -> None:
+    url = _normalize_cdn_url(url)
+    if not legacy_is_post_image(url):
+        return
+    file_id = legacy_file_id(url)
+    if not file_id:
+        return
+    counts[file_id] = counts.get(file_id, 0) + 1
+    first_pos.setdefault(file_id, position)
+    if file_id not in best_url or legacy_is_better(url, best_url[file_id]):
+        best_url[file_id] = url
+
+
+def legacy_collect(
+    html_content: str,
+    limit: int = 5,
+    img_tag_images: Sequence[str] = (),
+    overlay: Optional[str] = None,
+) -> tuple[List[str], int]:
+    best_url: Dict[str, str] = {}
+    first_pos: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    img_tag_ids: List[str] = []
+
+    for url in img_tag_images:
+        legacy_register(url, _find_url_position(html_content, url), best_url, first_pos, counts)
+        file_id = legacy_file_id(url)
+        if file_id:
+            img_tag_ids.append(file_id)
+
+    for match in re.finditer(r'"uri"\s*:\s*"((?:[^"\\]|\\.)*)"', html_content):
+        decoded = _decode_json_string(match.group(1))
+        if decoded and "scontent" in decoded:
+            legacy_register(decoded, match.start(), best_url, first_pos, counts)
+
+    for match in re.finditer(r"https://scontent[^\"'<>\s\\]+", html_content):
+        legacy_register(match.group(0).rstrip("\\"), match.start(), best_url, first_pos, counts)
+
+    if not best_url:
+        return [], 0
+
+    if img_tag_ids:
+        gallery_ids = set(img_tag_ids)
+        if overlay and not _is_compact_gallery_layout(len(img_tag_ids), overlay):
+            cluster_min = min(first_pos[file_id] for file_id in gallery_ids)
+            cluster_max = max(first_pos[file_id] for file_id in gallery_ids)
+            for file_id, url in best_url.items():
+                if file_id in gallery_ids:
+                    continue
+                dimensions = legacy_dimensions(url)
+                if not dimensions or max(dimensions) < 350:
+                    continue
+                if counts.get(file_id, 0) < 3:
+                    continue
+                if cluster_min - 5000 <= first_pos.get(file_id, 0) <= cluster_max + 200000:
+                    gallery_ids.add(file_id)
+        candidates = sorted(gallery_ids, key=lambda file_id: first_pos[file_id])
+    else:
+        high_confidence = [file_id for file_id, count in counts.items() if count >= 5]
+        if not high_confidence:
+            high_confidence = list(best_url.keys())
+        candidates = sorted(high_confidence, key=lambda file_id: first_pos[file_id])
+    return [best_url[file_id] for file_id in candidates[:limit]], len(candidates)
+
+
+def legacy_regex_images(html_content: str, limit: int = 5) -> List[str]:
+    images: List[str] = []
+    for match in re.finditer(r"https://scontent[^\"'<>\s\\]+", html_content):
+        url = _normalize_cdn_url(match.group(0).rstrip("\\"))
+        if not legacy_is_post_image(url):
+            continue
+        images.append(url)
+        if len(_dedupe_images(images)) >= limit:
+            break
+    return _dedupe_images(images)[:limit]
+
+
+def cdn_url(rng: random.Random, file_id: str, size: int) -> str:
+    return (
+        f"https://scontent.fbkk5-1.fna.fbcdn.net/v/t39.30808-6/{file_id}_n.jpg"
+        f"?stp=dst-jpg_s{size}x{size}&_nc_cat={rng.randint(100, 999)}&cstp=mx{size}x{size}&oe=6700AB12"
+    )
+
+
+def synthetic_page(seed: int = 3, posts: int = 40, filler_kb: int = 1200) -> tuple[str, List[str]]:
+    rng = random.Random(seed)
+    file_ids = [f"{rng.randint(10**8, 10**9)}_{rng.randint(10**14, 10**15)}" for _ in range(posts)]
+    parts: List[str] = ["<html><head><title>Facebook</title></head><body>"]
+    for index, file_id in enumerate(file_ids):
+        parts.append("<div>" + "x" * (filler_kb * 1024 // (posts * 2)) + "</div>")
+        # pages repeat each rendition of an image many times, escaped like Facebook's JSON
+        renditions = [cdn_url(rng, file_id, size) for size in rng.sample([320, 720, 960, 2048], 2)]
+        for _ in range(1 + index % 6):
+            uri = json.dumps(rng.choice(renditions)).replace("/", "\\/")
+            parts.append(f'<script type="application/json">{{"image":{{"uri":{uri}}}}}</script>')
+            parts.append(f'<a href="{rng.choice(renditions)}"></a>')
+        parts.append(f'<img src="{cdn_url(rng, file_id, 40)}">')
+        parts.append('<script>{"uri":"https:\\/\\/www.facebook.com\\/","text":"no image here"}</script>')
+    parts.append("</body></html>")
+    gallery = [cdn_url(rng, file_id, 960) for file_id in file_ids[5:9]]
+    return "".join(parts), gallery
+
+
+def clear_caches() -> None:
+    for cached in (
+        facebook_image._is_post_image,
+        facebook_image._facebook_file_id,
+        facebook_image._classify_cdn_url,
+        facebook_image._decode_cdn_uri,
+        _content_dimensions,
+    ):
+        cached.cache_clear()
+
+
+def bench_page(name: str, html_content: str, img_tag_images: Sequence[str], number: int) -> None:
+    for overlay in (None, "+3"):
+        assert legacy_collect(html_content, img_tag_images=img_tag_images, overlay=overlay) == \
+            _collect_post_images_from_html(html_content, img_tag_images=img_tag_images, overlay=overlay)
+    assert legacy_regex_images(html_content) == _extract_images_from_regex(html_content)
+
+    def new_collect() -> None:
+        # every page is new to the bot, so the URL caches start cold
+        clear_caches()
+        _collect_post_images_from_html(html_content, img_tag_images=img_tag_images)
+
+    legacy = timeit.timeit(lambda: legacy_collect(html_content, img_tag_images=img_tag_images), number=number)
+    new = timeit.timeit(new_collect, number=number)
+    print(
+        f"{name} ({len(html_content) / 1024:.0f} KiB): legacy {legacy / number * 1000:.2f} ms, "
+        f"memoized {new / number * 1000:.2f} ms ({legacy / new:.2f}x)"
+    )
+
+
+def main() -> None:
+    number = 20
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                html_content = f.read()
+            page = facebook_image.FacebookPage(html_content)
+            bench_page(path, html_content, page.img_candidates, number)
+    else:
+        html_content, gallery = synthetic_page()
+        bench_page("synthetic", html_content, gallery, number)
+
+
+if __name__ == "__main__":
+    main()
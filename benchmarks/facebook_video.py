@@ -0,0 +1,90 @@
+"""Microbenchmark: one get_nested_value walk per key vs a single get_nested_values walk.
+
+Pass recorded Facebook reel pages to measure their embedded JSON; without
+arguments a synthetic GraphQL-like tree is generated. Run from the
+repository root:
+    python -m benchmarks.facebook_video [saved_reel.html ...]
+"""
+import json
+import random
+import sys
+import timeit
+from typing import Any, List
+
+from bs4 import BeautifulSoup
+
+from module.facebook import get_nested_value, get_nested_values
+
+PAGE_KEYS = ("preferred_thumbnail", "browser_native_hd_url", "data", "owner_as_page", "representations")
+DATA_KEYS = ("owner", "message")
+
+
+def synthetic_tree(seed: int = 11, width: int = 4, depth: int = 7) -> Any:
+    rng = random.Random(seed)
+
+    def node(level: int) -> Any:
+        if level == depth:
+            return {"id": str(rng.getrandbits(48)), "text": "x" * rng.randint(5, 40), "owner": None}
+        return {
+            "__typename": rng.choice(["Story", "Comment", "Feedback"]),
+            "edges": [node(level + 1) for _ in range(width)],
+            "count": rng.randint(0, 1000),
+        }
+
+    video = {
+        "id": "1234567890",
+        "title": None,
+        "message": {"text": "reel caption"},
+        "owner": {"id": "42"},
+        "feedback": {"total_comment_count": 3},
+        "preferred_thumbnail": {"image": {"uri": "https://scontent.example/thumb.jpg"}},
+        "browser_native_hd_url": "https://video.example/hd.mp4",
+        "representations": [{"mime_type": "video/mp4", "base_url": "https://video.example/v.mp4"}],
+    }
+    tree = node(0)
+    # the video sits near the end of the payload, as on real reel pages
+    tree["edges"].append({"result": {"data": video}})
+    return tree
+
+
+def page_trees(path: str) -> List[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    trees = []
+    for script in soup.find_all("script", type="application/json"):
+        if script.string and "base_url" in script.string:
+            trees.append(json.loads(script.string))
+    return trees
+
+
+def legacy(tree: Any) -> tuple:
+    page = tuple(get_nested_value(tree, key) for key in PAGE_KEYS)
+    data = page[2]
+    return page + tuple(get_nested_value(data, key) for key in DATA_KEYS)
+
+
+def single_walk(tree: Any) -> tuple:
+    found = get_nested_values(tree, PAGE_KEYS)
+    in_data = get_nested_values(found["data"], DATA_KEYS)
+    return tuple(found[key] for key in PAGE_KEYS) + tuple(in_data[key] for key in DATA_KEYS)
+
+
+def bench(name: str, tree: Any, number: int) -> None:
+    assert legacy(tree) == single_walk(tree)
+    old = timeit.timeit(lambda: legacy(tree), number=number)
+    new = timeit.timeit(lambda: single_walk(tree), number=number)
+    print(f"{name}: legacy {old / number * 1000:.2f} ms, single walk {new / number * 1000:.2f} ms ({old / new:.2f}x)")
+
+
+def main() -> None:
+    number = 20
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            for index, tree in enumerate(page_trees(path)):
+                bench(f"{path}#{index}", tree, number)
+    else:
+        bench("synthetic", synthetic_tree(), number)
+
+
+if __name__ == "__main__":
+    main()
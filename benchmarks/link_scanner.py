@@ -0,0 +1,82 @@
+"""Microbenchmark: legacy on_message link detection vs module.links.scan_links.
+
+Run from the repository root:
+    python -m benchmarks.link_scanner
+"""
+import random
+import re
+import timeit
+
+from module.links import scan_links
+
+PLAIN_MESSAGES = [
+    "555555 ตลกมาก",
+    "ใครว่างบ้าง คืนนี้เล่นเกมกัน",
+    "brb getting food",
+    "<@123456789012345678> ดูอันนี้ยัง",
+    "gg ez <:pepe:987654321098765432>",
+    "```py\nprint('hello')\n```",
+    "ไปกินข้าวที่ไหนดี" * 4,
+]
+OTHER_LINK_MESSAGES = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "ดูอันนี้ https://x.com/someone/status/1790000000000000000",
+    "https://cdn.discordapp.com/attachments/1/2/image.png",
+]
+SUPPORTED_LINK_MESSAGES = [
+    "https://www.tiktok.com/@someone/video/7301234567890123456?is_from_webapp=1",
+    "5555 https://vt.tiktok.com/ZSMy8NuMg/",
+    "https://www.facebook.com/reel/1234567890123456",
+    "https://www.facebook.com/share/p/1AbCdEfGhI/ ใครโพสต์",
+    "https://fb.watch/abcDEF123/ and https://www.tiktok.com/@x/photo/7301234567890123457",
+]
+
+
+def build_corpus(size: int = 10_000, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.85:
+            corpus.append(rng.choice(PLAIN_MESSAGES))
+        elif roll < 0.95:
+            corpus.append(rng.choice(OTHER_LINK_MESSAGES))
+        else:
+            corpus.append(rng.choice(SUPPORTED_LINK_MESSAGES))
+    return corpus
+
+
+def legacy_scan(content: str) -> list[tuple[str, bool | None]]:
+    results = []
+    urls = re.findall(r'https?://[^\s]*?(?:(?:tiktok\.com|facebook\.com|fb\.watch)/\S*)', content)
+    for url in urls:
+        if re.search(r'tiktok\.com/.*/', url):
+            results.append(("TikTok", None))
+        elif re.search(r'(facebook\.com/|fb\.watch/)', url):
+            video_patterns = [
+                "fb.watch", "/watch", "/reel/", "/videos/", "video.php", "story.php", "/share/v/", "/share/r/"
+            ]
+            results.append(("Facebook", any(pattern in url for pattern in video_patterns)))
+        elif re.search(r'instagram\.com/(p|reel|tv)/([A-Za-z0-9_-]+)/?', url):
+            results.append(("Instagram", None))
+    return results
+
+
+def new_scan(content: str) -> list[tuple[str, bool | None]]:
+    return [
+        (link.platform, link.is_video if link.platform == "Facebook" else None)
+        for link in scan_links(content)
+    ]
+
+
+def main() -> None:
+    corpus = build_corpus()
+    assert [legacy_scan(m) for m in corpus] == [new_scan(m) for m in corpus]
+
+    for name, scan in (("legacy", legacy_scan), ("scan_links", new_scan)):
+        seconds = min(timeit.repeat(lambda: [scan(m) for m in corpus], number=5, repeat=5)) / 5
+        print(f"{name:>10}: {seconds * 1e6 / len(corpus):.2f} us/message ({len(corpus)} messages)")
+
+
+if __name__ == "__main__":
+    main()
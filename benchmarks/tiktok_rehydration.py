@@ -0,0 +1,88 @@
+"""Microbenchmark: per-page CPU time of the BeautifulSoup and regex paths of TikTokv2.process_html.
+
+Pass recorded TikTok video pages to measure real HTML; without arguments
+a synthetic page of similar shape is generated. Run from the repository
+root:
+    python -m benchmarks.tiktok_rehydration [saved_page.html ...]
+"""
+import json
+import random
+import sys
+import time
+
+from module.tiktok import REHYDRATION_SCRIPT_ID, TikTokv2
+
+
+def synthetic_page(seed: int = 5) -> str:
+    rng = random.Random(seed)
+    item = {
+        "id": "7301234567890123456",
+        "desc": "test " * 40,
+        "stats": {"playCount": 1, "diggCount": 2, "commentCount": 3, "collectCount": 4, "shareCount": 5},
+        "video": {
+            "cover": "https://p16-sign.tiktokcdn.com/cover.jpeg",
+            "bitrateInfo": [
+                {"PlayAddr": {"DataSize": rng.randint(10**6, 10**7), "UrlList": [f"https://v16.tiktokcdn.com/{i}.mp4"]}}
+                for i in range(4)
+            ],
+        },
+        "author": {"nickname": "someone", "uniqueId": "someone"},
+        "music": {"title": "original sound"},
+    }
+    scope = {
+        "webapp.video-detail": {"itemInfo": {"itemStruct": item}, "statusMsg": "ok"},
+        # the rest of the app state that real pages carry alongside the post
+        "webapp.app-context": {f"key_{i}": "x" * rng.randint(10, 200) for i in range(2000)},
+    }
+    head = "".join(
+        f'<link rel="preload" href="https://sf16.tiktokcdn.com/{i}.js"><script src="/static/{i}.js"></script>'
+        for i in range(150)
+    )
+    body = "".join(f'<div class="css-{i}"><span>{"y" * 40}</span></div>' for i in range(3000))
+    data = json.dumps({"__DEFAULT_SCOPE__": scope})
+    return (
+        f"<!DOCTYPE html><html><head>{head}</head><body>{body}"
+        f'<script id="{REHYDRATION_SCRIPT_ID}" type="application/json">{data}</script>'
+        "</body></html>"
+    )
+
+
+def new_scraper() -> TikTokv2:
+    # skip __init__, which fetches the page over the network
+    scraper = TikTokv2.__new__(TikTokv2)
+    scraper._setup("https://www.tiktok.com/@someone/video/7301234567890123456", True)
+    return scraper
+
+
+def cpu_ms(run, number: int) -> float:
+    start = time.process_time()
+    for _ in range(number):
+        run()
+    return (time.process_time() - start) / number * 1000
+
+
+def bench(name: str, html_content: str, number: int) -> None:
+    soup_result = new_scraper()._process_html_with_soup(html_content)
+    fast_result = new_scraper().process_html(200, html_content)
+    assert soup_result == fast_result
+
+    soup_ms = cpu_ms(lambda: new_scraper()._process_html_with_soup(html_content), number)
+    fast_ms = cpu_ms(lambda: new_scraper().process_html(200, html_content), number)
+    print(
+        f"{name} ({len(html_content) / 1024:.0f} KiB): BeautifulSoup {soup_ms:.2f} ms CPU, "
+        f"regex {fast_ms:.2f} ms CPU ({soup_ms / fast_ms:.1f}x)"
+    )
+
+
+def main() -> None:
+    number = 10
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                bench(path, f.read(), number)
+    else:
+        bench("synthetic", synthetic_page(), number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: legacy keyboard-layout translation vs module.transliterate.
+
+Run from the repository root:
+    python -m benchmarks.transliterate
+"""
+import json
+import re
+import timeit
+
+from module.transliterate import Transliterator
+
+with open(file="module/keyboard_map.json", mode="r", encoding="utf-8") as f:
+    EN_TO_TH: dict[str, str] = json.load(fp=f)
+
+
+def legacy_translate_en_th(text: str) -> str:
+    translated = []
+    for char in text:
+        translated.append(EN_TO_TH.get(char, char))
+    return "".join(translated)
+
+
+def legacy_translate_with_preserving_syntax(text: str) -> str:
+    discord_syntax = r'<[a-z]?@?&?!?#?\d+>|<[a-z]?:[a-zA-Z0-9_]+:\d+>|<t:\d+(?::[tTdDfFR])?>|</[a-zA-Z0-9_-]+:\d+>'
+    code_blocks = r'```.*?```|`.*?`'
+    urls = r'https?://[^\s<>]+'
+    combined_pattern = f'({discord_syntax}|{code_blocks}|{urls})'
+    parts = re.split(combined_pattern, text, flags=re.DOTALL)
+    translated_parts = []
+    for part in parts:
+        if re.fullmatch(combined_pattern, part, flags=re.DOTALL):
+            translated_parts.append(part)
+        else:
+            translated_parts.append(legacy_translate_en_th(part))
+    return "".join(translated_parts)
+
+
+def build_message(length: int = 4000) -> str:
+    pieces = [
+        "l;ylfu 8iy[ iy[==mpko ",
+        "<@123456789012345678> ",
+        "`code span` ",
+        "https://www.tiktok.com/@someone/video/7301234567890123456 ",
+        "<:pepe:987654321098765432> ",
+        "```py\nprint('hi')\n``` ",
+        "vkp dkiydki9y'0k ",
+    ]
+    text = ""
+    i = 0
+    while len(text) < length:
+        text += pieces[i % len(pieces)]
+        i += 1
+    return text[:length]
+
+
+def main() -> None:
+    keyboard = Transliterator(EN_TO_TH)
+    message = build_message()
+    assert legacy_translate_with_preserving_syntax(message) == keyboard.translate_preserving_syntax(message, "en_th")
+
+    cases = (
+        ("legacy", lambda: legacy_translate_with_preserving_syntax(message)),
+        ("Transliterator", lambda: keyboard.translate_preserving_syntax(message, "en_th")),
+        ("Transliterator (auto)", lambda: keyboard.translate_preserving_syntax(message)),
+    )
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=200, repeat=5)) / 200
+        print(f"{name:>22}: {seconds * 1e6:.1f} us per {len(message)}-char message")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 
 import os
 import re
-from typing import Optional, Dict, List, Tuple, Any, Union
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Literal, Tuple, Any, Union
 from dotenv import load_dotenv
 import asyncio
 import discord
+from discord import app_commands
 from discord.ext import commands
 import json
 import aiohttp
@@ -13,14 +15,28 @@ import logging
 from logging import Logger
 from discord.flags import Intents
 import requests
-from module import Facebook, TikTokv2
+from module import FacebookAsync, TikTokAsync, select_video_quality
 from module.send_component_v2 import (
     FETCHING_MESSAGE,
     edit_facebook_error_reply,
+    fetch_facebook_post,
     send_facebook_video,
     send_facebook_image,
 )
-from module.utils import json_append
+from module.cache import cdn_expiry, media_cache
+from module.concurrency import ReplyTurn, run_in_link_order
+from module.embed_waiter import EmbedWaiter
+from module.headers import DESKTOP_USER_AGENT, FACEBOOK_HEADERS
+from module.http_client import HttpClient
+from module.links import Link, post_cache_key, scan_links
+from module.mirrors import MirrorManager
+from module.resilience import RETRYABLE_ERRORS, circuit_breakers, is_platform_failure
+from module.scheduler import LinkScheduler, message_priority
+from module.settings import ChannelSettings
+from module.singleflight import resolution_flights
+from module.store import ResolutionStore
+from module.transliterate import Transliterator
+from module.utils import image_debug, video_debug
 
 # Setup discord logging
 logger: Logger = logging.getLogger(name='discord')
@@ -29,9 +45,17 @@ load_dotenv()
 TOKEN: str = os.environ["TOKEN"]
 db_path = 'data.db'
 
+# จำนวนลิงก์ที่ประมวลผลพร้อมกันได้ ต่อหนึ่งข้อความ และทั้งบอท
+PER_MESSAGE_LINK_CONCURRENCY = int(os.environ.get("PER_MESSAGE_LINK_CONCURRENCY", 4))
+GLOBAL_LINK_CONCURRENCY = int(os.environ.get("GLOBAL_LINK_CONCURRENCY", 16))
+# เวลารอให้ Discord สร้าง embed ของลิงก์ mirror
+EMBED_TIMEOUT_SECONDS = 10
+TIKTOK_MIRROR_DOMAINS = ["a.tnktok.com", "tfxktok.com"]
+# ขนาดวิดีโอ TikTok สูงสุดที่จะเลือก (ไบต์) เลือก encode ที่ดีที่สุดที่ไม่เกินนี้ ตั้งเป็น 0 เพื่อเอาตัวแรกเสมอ
+TIKTOK_MAX_VIDEO_BYTES = int(os.environ.get("TIKTOK_MAX_VIDEO_BYTES", 10 * 1024 * 1024)) or None
+
 # Load keyboard mapping
-with open(file='module/keyboard_map.json', mode='r', encoding='utf-8') as f:
-    EN_TO_TH: Dict[str, str] = json.load(fp=f)
+keyboard: Transliterator = Transliterator.from_file('module/keyboard_map.json')
 
 intents: Intents = discord.Intents.default()
 intents.message_content = True
@@ -40,116 +64,126 @@ intents.message_content = True
 class Bot(commands.Bot):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
+        self.http_client = HttpClient()
         self.aiohttp_session: aiohttp.ClientSession
         self.db: aiosqlite.Connection
-        self.channel_ids = []
+        self.resolution_store: Optional[ResolutionStore] = None
+        self.settings: ChannelSettings
+        self.link_scheduler = LinkScheduler(GLOBAL_LINK_CONCURRENCY)
+        self.embed_waiter = EmbedWaiter()
+        self.tiktok_mirrors = MirrorManager(TIKTOK_MIRROR_DOMAINS, default_timeout=EMBED_TIMEOUT_SECONDS)
 
     async def setup_hook(self) -> None:
-        self.aiohttp_session = aiohttp.ClientSession()
+        self.aiohttp_session = await self.http_client.start()
         self.db = await aiosqlite.connect(database=db_path)
+        self.settings = ChannelSettings(self.db)
+        await self.settings.setup()
+        self.resolution_store = ResolutionStore(self.db)
+        await self.resolution_store.setup()
+        media_cache.store = self.resolution_store
     
     async def close(self) -> None:
-        if self.aiohttp_session:
-            await self.aiohttp_session.close()
+        await self.http_client.close()
+        if self.resolution_store:
+            await self.resolution_store.close()
         if self.db:
             await self.db.close()
+        await video_debug.close()
+        await image_debug.close()
         await super().close()
 
 bot: Bot = Bot(command_prefix=commands.when_mentioned, intents=intents, shard_count=2)
 
-async def setup_table() -> None:
-    """สร้างตารางเก็บ channel ID ในฐานข้อมูล SQLite"""
-    async with bot.db.cursor() as cursor:
-        await cursor.execute(
-            sql="CREATE TABLE IF NOT EXISTS channels (channel_id INTEGER PRIMARY KEY)"
-        )
-        await bot.db.commit()
-
-async def load_channels() -> None:
-    """โหลด channel ID จากฐานข้อมูลเข้าสู่ตัวแปร bot.channel_ids"""
-    async with bot.db.cursor() as cursor:
-        await cursor.execute("SELECT channel_id FROM channels")
-        rows = await cursor.fetchall()
-        bot.channel_ids = [row[0] for row in rows]
-
-class Validator:
-    tiktok_pattern = r'tiktok\.com/.*/'
-    instag_pattern = r'instagram\.com/(p|reel|tv)/([A-Za-z0-9_-]+)/?'
-    facebook_pattern = r'(facebook\.com/|fb\.watch/)'
-    @staticmethod
-    def validate(url: str) -> Tuple[str, Optional[str]]:
-        if re.search(Validator.tiktok_pattern, url):
-            return "TikTok", url
-        if re.search(Validator.facebook_pattern, url):
-            return "Facebook", url
-        insta_match = re.search(Validator.instag_pattern, url)
-        if insta_match:
-            return "Instagram", insta_match.group(2)
-        return "Invalid URL", None
-
-def translate_en_th(text: str) -> str:
-    translated = []
-    for char in text:
-        translated.append(EN_TO_TH.get(char, char))
-    return "".join(translated)
-
-def translate_with_preserving_syntax(text: str) -> str:
-    # 1. Regex for Discord Syntax (<@123>, <:emoji:123>, <t:123>, etc.)
-    discord_syntax = r'<[a-z]?@?&?!?#?\d+>|<[a-z]?:[a-zA-Z0-9_]+:\d+>|<t:\d+(?::[tTdDfFR])?>|</[a-zA-Z0-9_-]+:\d+>'
-    
-    # 2. Regex for Code Blocks (```code``` or `code`)
-    code_blocks = r'```.*?```|`.*?`'
-    
-    # 3. Regex for URLs (http, https)
-    urls = r'https?://[^\s<>]+'
-    
-    # Combine all patterns using OR (|)
-    # We use flags=re.DOTALL to make sure '.' matches newlines in code blocks
-    combined_pattern = f'({discord_syntax}|{code_blocks}|{urls})'
-    
-    # Split text while keeping the matched patterns
-    parts = re.split(combined_pattern, text, flags=re.DOTALL)
-    translated_parts = []
-    
-    for part in parts:
-        # Check if the part matches any of our "protected" patterns
-        if re.fullmatch(combined_pattern, part, flags=re.DOTALL):
-            translated_parts.append(part)
-        else:
-            # Translate only the parts that are plain text
-            translated_parts.append(translate_en_th(part))
-            
-    return "".join(translated_parts)
-
 async def get_video(source: str, url: str) -> Optional[str]:
     """Fetch video details from URL"""
+    cache_key = post_cache_key(source, "video", url)
+    if cached_url := await media_cache.aget(cache_key):
+        return cached_url
+    # ลิงก์เดียวกันที่ถูกส่งมาพร้อมกันหลายที่ ให้ดึงข้อมูลครั้งเดียวแล้วแบ่งผลกัน
+    return await resolution_flights.do(cache_key, lambda: fetch_video(source, url, cache_key))
+
+async def fetch_video(source: str, url: str, cache_key: str) -> Optional[str]:
+    """Scrape the video URL of a post and cache it under cache_key"""
+    # แพลตฟอร์มล่มอยู่ ไม่ต้องลองดึงให้เสียเวลา ไปทาง facebed/error เลย
+    breaker = circuit_breakers.get(source)
+    if not breaker.allow():
+        logger.warning("%s circuit breaker is open, skipping video scrape: url=%s", source, url)
+        return None
+    # นับเป็นความล้มเหลวของแพลตฟอร์มเฉพาะ network error, 429 และ 5xx
+    # โพสต์ส่วนตัว/หาไม่เจอเป็นเรื่องของโพสต์นั้น ไม่ควรทำให้ breaker เปิด
+    platform_failed: Optional[bool] = None
     try:
+        scraper: Union[TikTokAsync, FacebookAsync]
         if source == "TikTok":
-            tiktok = TikTokv2(url=url, cut=True)
-            data, status = tiktok.getData()
+            scraper = await TikTokAsync(url=url, session=bot.aiohttp_session, cut=True).load()
+            data, status = scraper.getData()
         elif source == "Facebook":
-            facebook = Facebook(url=url, cut=True)
-            data, status = facebook.getVideo()
-   
+            scraper = FacebookAsync(url=url, session=bot.aiohttp_session, cut=True)
+            data, status = await scraper.getVideo()
+        platform_failed = is_platform_failure(scraper.page_status)
+
         if status == 200:
-            json_append(data, file="debug.json", max_items=50)
+            video_debug.record(data)
+            video_url = None
             if 'tiktok' in data['platform']:
-                return data['videos'][0]['quality_0']['address']
+                quality = select_video_quality(data['videos'], TIKTOK_MAX_VIDEO_BYTES)
+                video_url = quality['address'] if quality else None
             elif 'facebook' in data['platform']:
-                return data['media'][0]['address']
+                video_url = data['media'][0]['address']
+            if video_url:
+                media_cache.set(cache_key, video_url, expires_at=cdn_expiry([video_url]))
+            return video_url
         else:
             logger.error(f"Error: {status}")
             logger.error(f"Details: {data}")
+    except RETRYABLE_ERRORS as e:
+        platform_failed = True
+        logger.error("Error fetching video", exc_info=e)
+        return None
     except Exception as e:
         logger.error("Error fetching video", exc_info=e)
         return None
+    finally:
+        if platform_failed is None:
+            breaker.release()
+        elif platform_failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+async def public_facebed_url(facebook_url: str) -> Optional[str]:
+    """Return the facebed link of a post, or None if facebed shows a login wall"""
+    if "facebook.com" not in facebook_url:
+        return None
+    facebed_url = re.sub(
+        r'https://(www\.)?facebook\.com/(.*)',
+        r'https://facebed.com/\2',
+        facebook_url,
+    )
+
+    async def probe() -> bool:
+        try:
+            async with bot.aiohttp_session.get(facebed_url) as resp:
+                facebed_text = await resp.text()
+        except RETRYABLE_ERRORS as error:
+            logger.warning("facebed probe failed: %s url=%s", error, facebed_url)
+            return False
+        return "Log in or sign up to view" not in facebed_text
+
+    if await resolution_flights.do(post_cache_key("Facebook", "facebed", facebook_url), probe):
+        return facebed_url
+    return None
+
+async def resolve_redirect(url: str) -> str:
+    """Follow a Facebook watch link to the URL it redirects to"""
+    headers = {**FACEBOOK_HEADERS, "User-Agent": DESKTOP_USER_AGENT}
+    async with bot.aiohttp_session.get(url, headers=headers) as resp:
+        return str(resp.url)
 
 @bot.event
 async def on_ready() -> None:
     """ฟังก์ชั่นที่ทำงานเมื่อบอทพร้อมใช้งาน"""
     logger.info(f'{bot.user} has connected to Discord!')
-    await setup_table()
-    await load_channels()
     
     # Sync commands
     logger.info("Syncing commands...")
@@ -161,7 +195,7 @@ async def on_ready() -> None:
 
 @bot.tree.context_menu(name="ไอเชี่ยนี่ลืมเปลี่ยนภาษา")
 async def translate_command(interaction: discord.Interaction, message: discord.Message) -> None:
-    translated_text = translate_with_preserving_syntax(message.content)
+    translated_text = keyboard.translate_preserving_syntax(message.content)
     # ตอบกลับข้อความต้นฉบับ โดยไม่ mention เจ้าของข้อความ
     await message.reply(
         f"{translated_text}\n-# {interaction.user.display_name} uses the '{interaction.command.name}' command.",
@@ -173,13 +207,7 @@ async def translate_command(interaction: discord.Interaction, message: discord.M
 @bot.tree.command(name="enabled", description="Enabled this message channel")
 async def enabled_channel(interaction: discord.Interaction) -> None:
     channel_id = interaction.channel.id
-    async with bot.db.cursor() as cursor:
-        await cursor.execute(
-            "DELETE FROM channels WHERE channel_id = ?",
-            (channel_id,)
-        )
-        await bot.db.commit()
-    await load_channels()
+    await bot.settings.set_channel_enabled(channel_id, True)
     await interaction.response.send_message(
         f"Channel {channel_id} has been set!", 
         ephemeral=True
@@ -188,137 +216,236 @@ async def enabled_channel(interaction: discord.Interaction) -> None:
 @bot.tree.command(name="disabled", description="Disabled this message channel")
 async def disabled_channel(interaction: discord.Interaction) -> None:
     channel_id = interaction.channel.id
-    async with bot.db.cursor() as cursor:
-        await cursor.execute(
-            "INSERT OR IGNORE INTO channels (channel_id) VALUES (?)", 
-            (channel_id,)
-        )
-        await bot.db.commit()
-    await load_channels()
+    await bot.settings.set_channel_enabled(channel_id, False)
     await interaction.response.send_message(
         f"Channel {channel_id} has been unset!",
         ephemeral=True
     )
 
+@bot.tree.command(name="platform", description="Turn a platform on or off in this channel or server")
+@app_commands.describe(scope="Apply to this channel only or the whole server")
+async def platform_setting(
+    interaction: discord.Interaction,
+    platform: Literal["TikTok", "Facebook"],
+    enabled: bool,
+    scope: Literal["channel", "server"] = "channel",
+) -> None:
+    if scope == "server" and interaction.guild is None:
+        await interaction.response.send_message("Server settings only work inside a server.", ephemeral=True)
+        return
+    # ตั้งค่าทั้งเซิร์ฟเวอร์ได้เฉพาะคนที่มีสิทธิ์ Manage Server
+    if scope == "server" and not interaction.permissions.manage_guild:
+        await interaction.response.send_message(
+            "You need the Manage Server permission to change server settings.",
+            ephemeral=True,
+        )
+        return
+    scope_id = interaction.channel.id if scope == "channel" else interaction.guild.id
+    await bot.settings.set_platform_enabled(
+        "channel" if scope == "channel" else "guild",
+        scope_id,
+        platform,
+        enabled,
+    )
+    await interaction.response.send_message(
+        f"{platform} has been turned {'on' if enabled else 'off'} for this {scope}!",
+        ephemeral=True
+    )
+
+def collect_stats() -> Dict[str, Any]:
+    """รวมตัวเลขสถิติภายในของบอท สำหรับดูขนาด cache และสุขภาพของ mirror"""
+    return {
+        "media_cache": media_cache.stats(),
+        "tiktok_mirrors": bot.tiktok_mirrors.stats(),
+        "http": bot.http_client.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "resolution_flights": resolution_flights.stats(),
+        "link_scheduler": bot.link_scheduler.stats(),
+        "debug_recorders": {"video": video_debug.stats(), "image": image_debug.stats()},
+    }
+
+@bot.command(name="stats")
+@commands.is_owner()
+async def stats_command(ctx: commands.Context) -> None:
+    """แสดงสถิติภายในของบอท (เฉพาะเจ้าของบอท)"""
+    stats = json.dumps(collect_stats(), indent=2, ensure_ascii=False)
+    await ctx.reply(f"```json\n{stats}\n```", mention_author=False)
+
+@bot.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent) -> None:
+    """ส่ง embed ที่ Discord เพิ่มให้ข้อความของบอทไปยังตัวที่รอ embed อยู่"""
+    author_id = payload.data.get("author", {}).get("id")
+    if bot.user is not None and author_id is not None and int(author_id) != bot.user.id:
+        return
+    bot.embed_waiter.feed_raw(payload)
+
 @bot.event
 async def on_message(message: discord.Message) -> None:
     """Handle messages in specified channels"""
-    if not message.author.bot and message.channel.id not in bot.channel_ids:
-        urls = re.findall(
-            r'https?://[^\s]*?(?:(?:tiktok\.com|facebook\.com|fb\.watch)/\S*)',
-            message.content
-        )
-        for url in urls:
-            logger.info(f"url detected: {url}")
-            await send_reply(message, url)
+    if not message.author.bot and bot.settings.is_channel_enabled(message.channel.id):
+        guild_id = message.guild.id if message.guild else None
+        links = [
+            link for link in scan_links(message.content)
+            if bot.settings.is_platform_enabled(link.platform, message.channel.id, guild_id)
+        ]
+        for link in links:
+            logger.info(f"url detected: {link.url}")
+        if links:
+            await handle_links(message, links)
     await bot.process_commands(message)
 
-async def send_reply(message: discord.Message, url: str) -> None:
-    """Handle video URL replies"""
+async def handle_links(message: discord.Message, links: List[Link]) -> None:
+    """ประมวลผลทุกลิงก์ในข้อความพร้อมกัน แต่ตอบกลับตามลำดับลิงก์"""
+    jobs = [
+        (
+            lambda link=link: resolve_link(link),
+            lambda turn, resolved, link=link: send_reply(message, link, resolved, turn),
+        )
+        for link in links
+    ]
+    # ทุกลิงก์ในข้อความเดียวอยู่คลาสเดียวกัน และเข้าคิวตามกิลด์ (DM ใช้ห้องแชทแทน)
+    guild = message.guild.id if message.guild else message.channel.id
+    priority = message_priority(links)
+    errors = await run_in_link_order(
+        jobs,
+        lambda: bot.link_scheduler.slot(guild, priority),
+        PER_MESSAGE_LINK_CONCURRENCY,
+    )
+    for link, error in zip(links, errors):
+        if error is not None:
+            logger.error("Link reply crashed: url=%s", link.url, exc_info=error)
+
+@dataclass
+class ResolvedLink:
+    """สิ่งที่ resolve_link หาได้ก่อนโพสต์อะไรลงแชท"""
+    url: str
+    mirrors: List[str] = field(default_factory=list)
+    facebed_url: Optional[str] = None
+    video_url: Optional[str] = None
+    post: Optional[Tuple[Optional[dict], int, str]] = None
+
+async def resolve_link(link: Link) -> ResolvedLink:
+    """Scrape everything a link needs without posting, so links resolve concurrently"""
+    if link.platform == 'TikTok':
+        return ResolvedLink(link.url, mirrors=bot.tiktok_mirrors.ordered())
+
+    url = link.url
+    if link.kind == "watch":
+        redirected_url = await resolution_flights.do(
+            post_cache_key(link.platform, "redirect", url),
+            lambda: resolve_redirect(url),
+        )
+        try:
+            video_id = redirected_url.split("/videos/")[1].split("/")[0]
+            url = f'https://www.facebook.com/reel/{video_id}'
+        except Exception:
+            pass
+
+    if not link.is_video:
+        return ResolvedLink(url, post=await fetch_facebook_post(bot.aiohttp_session, url))
+    # ลอง facebed ก่อน ถ้าใช้ไม่ได้ค่อย scrape วิดีโอเอง
+    resolved = ResolvedLink(url, facebed_url=await public_facebed_url(url))
+    if resolved.facebed_url is None:
+        resolved.video_url = await get_video(link.platform, url)
+    return resolved
+
+async def send_reply(message: discord.Message, link: Link, resolved: ResolvedLink, turn: ReplyTurn) -> None:
+    """Post the reply of a resolved link
+
+    Only the first reply goes through the turn; every later change edits that
+    reply instead of deleting it, so the link keeps its place in the order.
+    """
+    url = resolved.url
+    reply: Optional[discord.Message] = None
+
+    async def show(content: str, **kwargs: Any) -> discord.Message:
+        nonlocal reply
+        if reply is None:
+            reply = await turn.reply(
+                message,
+                content,
+                mention_author=False,
+                allowed_mentions=discord.AllowedMentions.none(),
+                **kwargs,
+            )
+        else:
+            bot.embed_waiter.forget(reply.id)
+            reply = await reply.edit(content=content, **kwargs)
+        return reply
+
     async def send_error() -> None:
-        error_msg = await message.reply(
+        # ใช้ delete_after แทน sleep เพื่อไม่ให้ถือ slot ของลิงก์ไว้ 30 วินาที
+        await show(
             "**Error: Can't get video url or post detail**\n-# *This message will be deleted in 30 seconds.*",
-            mention_author=False
+            delete_after=30,
         )
-        await asyncio.sleep(30)
-        await error_msg.delete()
-
-    async def try_embed(content: str) -> bool:
-        reply = await message.reply(content, mention_author=False)
-        end_time = asyncio.get_event_loop().time() + 10
-        
-        while asyncio.get_event_loop().time() <= end_time:
-            reply = await message.channel.fetch_message(reply.id)
-            if reply.embeds:
-                for embed in reply.embeds:
-                    if embed.title == "Log in or sign up to view":
-                        await reply.delete()
-                        return False
-                await message.edit(suppress=True)
-                return True
-            await asyncio.sleep(0.5)
-        
-        await reply.delete()
-        return False
-
-    async def try_facebed_embed(facebook_url: str) -> bool:
-        if "facebook.com" not in facebook_url:
-            return False
-        facebed_url = re.sub(
-            r'https://(www\.)?facebook\.com/(.*)',
-            r'https://facebed.com/\2',
-            facebook_url,
+
+    async def try_embed(content: str, mirror: Optional[str] = None) -> bool:
+        timeout = EMBED_TIMEOUT_SECONDS
+        if mirror:
+            timeout = bot.tiktok_mirrors.timeout_for(mirror)
+            bot.tiktok_mirrors.start(mirror)
+        started = asyncio.get_running_loop().time()
+        shown = await show(content)
+        embeds = shown.embeds or await bot.embed_waiter.wait(shown.id, timeout)
+        if not embeds:
+            # เผื่อ gateway event หลุด เช็คผ่าน REST อีกครั้งเดียว
+            embeds = (await message.channel.fetch_message(shown.id)).embeds
+        elapsed = asyncio.get_running_loop().time() - started
+
+        success = bool(embeds) and not any(
+            embed.title == "Log in or sign up to view" for embed in embeds
         )
-        async with bot.aiohttp_session.get(facebed_url) as resp:
-            facebed_text = await resp.text()
-        if "Log in or sign up to view" not in facebed_text:
-            logger.info("Try to embed with facebed url: %s", facebed_url)
-            return await try_embed(
-                f"> [Facebook](<{facebook_url}>) - [facebed]({facebed_url})"
-            )
-        return False
+        if mirror:
+            bot.tiktok_mirrors.record(mirror, success, elapsed)
+        if success:
+            await message.edit(suppress=True)
+        return success
+
+    async def try_facebed_embed(facebed_url: Optional[str]) -> bool:
+        if facebed_url is None:
+            return False
+        logger.info("Try to embed with facebed url: %s", facebed_url)
+        return await try_embed(f"> [Facebook](<{url}>) - [facebed]({facebed_url})")
 
-    async def handle_facebook_image_failure(placeholder: discord.Message) -> None:
-        await placeholder.delete()
-        if await try_facebed_embed(url):
-            return
-        await send_error()
+    source = link.platform
 
-    source, item_id = Validator.validate(url)
-    
     if source == 'TikTok':
-        for domain in ["a.tnktok.com", "tfxktok.com"]:
+        for domain in resolved.mirrors:
             new_url = '/'.join(url.split('/', 3)[:2] + [domain] + url.split('/', 3)[3:])
-            if await try_embed(f"> [Video on Tiktok]({new_url})"):
+            if await try_embed(f"> [Video on Tiktok]({new_url})", mirror=domain):
                 return
 
         if video_url := await get_video(source, url):
-            await message.reply(
-                f"> [Video on Tiktok]({video_url})",
-                mention_author=False
-            )
+            await show(f"> [Video on Tiktok]({video_url})")
         else:
             await send_error()
 
     if source == 'Facebook':
-        def is_facebook_video(url: str) -> bool:
-            video_patterns = [
-                "fb.watch", "/watch", "/reel/", "/videos/", "video.php", "story.php", "/share/v/", "/share/r/"
-            ]
-            return any(pattern in url for pattern in video_patterns)
-        
-        if any(x in url for x in ['fb.watch', '/watch/?v']):
-            async with bot.aiohttp_session.get(url) as resp:
-                redirected_url = str(resp.url)
-            try:
-                video_id = redirected_url.split("/videos/")[1].split("/")[0]
-                url = f'https://www.facebook.com/reel/{video_id}'
-            except Exception:
-                pass
-
-        is_video = is_facebook_video(url)
-
-        if is_video and await try_facebed_embed(url):
+        is_video = link.is_video
+        if is_video and await try_facebed_embed(resolved.facebed_url):
             return
 
-        placeholder = await message.reply(
-            FETCHING_MESSAGE,
-            mention_author=False,
-            allowed_mentions=discord.AllowedMentions.none(),
-        )
+        placeholder = await show(FETCHING_MESSAGE)
 
         try:
             if is_video:
-                video_url = await get_video(source, url)
+                video_url = resolved.video_url
+                if resolved.facebed_url is not None:
+                    # facebed ใช้ได้ตอนเช็ค แต่ Discord ไม่ยอม embed ให้ ค่อย scrape ตอนนี้
+                    video_url = await get_video(source, url)
                 if not video_url:
                     logger.error("Facebook video scrape failed: url=%s", url)
                 success, status, error_msg = await send_facebook_video(
                     TOKEN, message, placeholder, bot.aiohttp_session, video_url
                 )
             else:
-                success, status, error_msg = await send_facebook_image(
-                    TOKEN, message, placeholder, bot.aiohttp_session, url
-                )
+                post_data, status, error_msg = resolved.post or (None, 400, "Post was not resolved.")
+                success = False
+                if post_data is not None:
+                    success, status, error_msg = await send_facebook_image(
+                        TOKEN, message, placeholder, bot.aiohttp_session, url, post_data
+                    )
             if success:
                 await message.edit(suppress=True)
                 return
@@ -330,16 +457,12 @@ async def send_reply(message: discord.Message, url: str) -> None:
                 status,
                 error_msg[:500],
             )
-            if is_video:
-                await edit_facebook_error_reply(placeholder)
-            else:
-                await handle_facebook_image_failure(placeholder)
         except Exception:
             logger.error("Facebook reply crashed: url=%s", url, exc_info=True)
-            if is_video:
-                await edit_facebook_error_reply(placeholder)
-            else:
-                await handle_facebook_image_failure(placeholder)
+        if is_video:
+            await edit_facebook_error_reply(placeholder)
+        elif not await try_facebed_embed(await public_facebed_url(url)):
+            await send_error()
 
 async def start_bot() -> bool:  
     try:
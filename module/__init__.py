@@ -1,4 +1,4 @@
-from .facebook import Facebook
-from .tiktok import TikTokv2
+from .facebook import Facebook, FacebookAsync
+from .tiktok import TikTokv2, TikTokAsync, select_video_quality
 
-__all__ = ['Facebook', 'TikTokv2']
\ No newline at end of file
+__all__ = ['Facebook', 'FacebookAsync', 'TikTokv2', 'TikTokAsync', 'select_video_quality']
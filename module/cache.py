@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from .links import url_expiry
+
+if TYPE_CHECKING:
+    from .store import ResolutionStore
+
+# Signed CDN URLs are dropped this long before they actually expire
+EXPIRY_MARGIN_SECONDS = 300
+
+
+class TTLCache:
+    """Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+    When a ResolutionStore is attached, aget() falls back to it on a memory
+    miss and set() writes entries through to it.
+    """
+
+    def __init__(self, max_items: int = 1024, default_ttl: float = 3600) -> None:
+        self.max_items = max_items
+        self.default_ttl = default_ttl
+        self.store: Optional["ResolutionStore"] = None
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._lookup(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like get(), but also checks the attached persistent store."""
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.store is not None:
+            stored = await self.store.get(key)
+            if stored is not None:
+                value, expires_at = stored
+                self._remember(key, value, expires_at)
+                self.store_hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        deadline = time.time() + (self.default_ttl if ttl is None else ttl)
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        if deadline <= time.time():
+            return
+        self._remember(key, value, deadline)
+        if self.store is not None:
+            self.store.put(key, value, deadline)
+
+    def _remember(self, key: str, value: Any, deadline: float) -> None:
+        self._entries[key] = (deadline, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.store_hits) / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def cdn_expiry(urls: Iterable[Optional[str]]) -> Optional[float]:
+    """Earliest expiry among signed CDN URLs, minus a safety margin."""
+    expiries = [expiry for expiry in map(url_expiry, urls) if expiry is not None]
+    if not expiries:
+        return None
+    return min(expiries) - EXPIRY_MARGIN_SECONDS
+
+
+# Resolved media shared by every platform, keyed by links.post_cache_key()
+media_cache = TTLCache(max_items=1024, default_ttl=6 * 3600)
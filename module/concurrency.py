@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, AsyncContextManager, Awaitable, Callable, List, Optional, Tuple
+
+import discord
+
+# A link's work, split so only the posting waits for the links before it
+Resolve = Callable[[], Awaitable[Any]]
+Publish = Callable[["ReplyTurn", Any], Awaitable[None]]
+
+
+class ReplyTurn:
+    """Keeps replies of links from the same message in link order.
+
+    A link may only post its reply after the previous link has posted its
+    own (or finished without posting). Each link posts a single message and
+    makes every later change (another mirror, the upload, an error) by
+    editing it, so its place in the order never moves.
+    """
+
+    def __init__(self, previous: Optional["ReplyTurn"] = None) -> None:
+        self.previous = previous
+        self.posted = asyncio.Event()
+
+    async def wait(self) -> None:
+        if self.previous is not None:
+            await self.previous.posted.wait()
+
+    async def reply(self, message: discord.Message, *args: Any, **kwargs: Any) -> discord.Message:
+        await self.wait()
+        try:
+            return await message.reply(*args, **kwargs)
+        finally:
+            self.posted.set()
+
+    def finish(self) -> None:
+        self.posted.set()
+
+
+async def run_in_link_order(
+    jobs: List[Tuple[Resolve, Publish]],
+    global_slot: Callable[[], AsyncContextManager[Any]],
+    per_message_limit: int,
+) -> List[Optional[BaseException]]:
+    """Runs one (resolve, publish) job per link concurrently under both concurrency caps.
+
+    resolve() does the scraping and never posts, so every link resolves at
+    once. publish(turn, resolved) posts through the turn once the previous
+    link has posted. global_slot() returns a fresh context manager holding
+    one slot of the bot-wide pool; slots are held around each phase but not
+    while a link waits for its turn, so waiting links never hold the pool.
+
+    Returns:
+        List[Optional[BaseException]]: The exception raised by each job, or None
+    """
+    per_message_slots = asyncio.Semaphore(max(1, per_message_limit))
+    turns: List[ReplyTurn] = []
+    previous: Optional[ReplyTurn] = None
+    for _ in jobs:
+        previous = ReplyTurn(previous)
+        turns.append(previous)
+
+    async def run(resolve: Resolve, publish: Publish, turn: ReplyTurn) -> None:
+        try:
+            async with per_message_slots, global_slot():
+                resolved = await resolve()
+            await turn.wait()
+            async with per_message_slots, global_slot():
+                await publish(turn, resolved)
+        finally:
+            turn.finish()
+
+    results = await asyncio.gather(
+        *(run(resolve, publish, turn) for (resolve, publish), turn in zip(jobs, turns)),
+        return_exceptions=True,
+    )
+    return [result if isinstance(result, BaseException) else None for result in results]
@@ -0,0 +1,57 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import discord
+
+
+class EmbedWaiter:
+    """Waits for Discord to attach link embeds to the bot's own replies.
+
+    Discord unfurls links asynchronously and announces the result through a
+    gateway MESSAGE_UPDATE, so feeding ``on_raw_message_edit`` into this
+    class replaces polling ``fetch_message`` over REST. Updates that arrive
+    before anyone waits on the message are kept in a small bounded buffer.
+    """
+
+    def __init__(self, recent_limit: int = 256) -> None:
+        self._waiters: Dict[int, asyncio.Future[List[discord.Embed]]] = {}
+        self._recent: OrderedDict[int, List[discord.Embed]] = OrderedDict()
+        self._recent_limit = recent_limit
+
+    def feed(self, message_id: int, embeds: List[discord.Embed]) -> None:
+        if not embeds:
+            return
+        future = self._waiters.pop(message_id, None)
+        if future is not None and not future.done():
+            future.set_result(embeds)
+            return
+        self._recent[message_id] = embeds
+        self._recent.move_to_end(message_id)
+        while len(self._recent) > self._recent_limit:
+            self._recent.popitem(last=False)
+
+    def feed_raw(self, payload: discord.RawMessageUpdateEvent) -> None:
+        raw_embeds = payload.data.get("embeds") or []
+        if raw_embeds:
+            self.feed(payload.message_id, [discord.Embed.from_dict(embed) for embed in raw_embeds])
+
+    def forget(self, message_id: int) -> None:
+        """Drops buffered embeds of a message, e.g. before its content is edited."""
+        self._recent.pop(message_id, None)
+
+    async def wait(self, message_id: int, timeout: float) -> Optional[List[discord.Embed]]:
+        """Returns the embeds of the message, or None if none arrive within timeout."""
+        embeds = self._recent.pop(message_id, None)
+        if embeds:
+            return embeds
+
+        future: asyncio.Future[List[discord.Embed]] = asyncio.get_running_loop().create_future()
+        self._waiters[message_id] = future
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if self._waiters.get(message_id) is future:
+                del self._waiters[message_id]
@@ -1,5 +1,6 @@
 # v2.0 form https://github.com/devfemibadmus/webmedia
 
+import asyncio
 import json
 import re
 from collections.abc import Iterable, Mapping
@@ -8,14 +9,9 @@ from urllib.parse import parse_qs, urlparse
 import requests
 from bs4 import BeautifulSoup
 
-MOBILE_USER_AGENT = (
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
-    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
-)
-DESKTOP_USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-)
+from .headers import MOBILE_USER_AGENT
+from .html_stream import read_scripts
+from .resilience import RETRYABLE_ERRORS
 
 
 def get_nested_value(data, key):
@@ -34,6 +30,81 @@ def get_nested_value(data, key):
     return None
 
 
+def get_nested_values(data, keys):
+    """get_nested_value for several keys in a single traversal.
+
+    Each key gets exactly what get_nested_value(data, key) would return, and
+    the walk stops as soon as every key has been found.
+    """
+    found = {}
+    _collect_nested_values(data, list(keys), found)
+    return {key: found.get(key) for key in keys}
+
+
+def _collect_nested_values(data, keys, found):
+    """Fills found for keys; returns the keys still missing after this subtree."""
+    if isinstance(data, Mapping):
+        searching = []
+        for key in keys:
+            if key in data:
+                # a None value ends get_nested_value's search of this subtree
+                if data[key] is not None:
+                    found[key] = data[key]
+            else:
+                searching.append(key)
+        children = data.values()
+    elif isinstance(data, Iterable) and not isinstance(data, str):
+        searching = keys
+        children = data
+    else:
+        return keys
+
+    for child in children:
+        if not searching:
+            break
+        searching = _collect_nested_values(child, searching, found)
+    return [key for key in keys if key not in found]
+
+
+_POST_SCRIPT_KEYWORDS = ("base_url", "total_comment_count")
+
+
+class _VideoScriptSearch:
+    """Finds the first thumbnail script and the first post data script as scripts stream in.
+
+    Calling it with the scripts read so far only looks at the ones added
+    since the previous call, and returns True once both have been found.
+    """
+
+    def __init__(self):
+        self.thumbnail_text = None
+        self.post_text = None
+        self._checked = 0
+
+    @property
+    def found(self):
+        return self.thumbnail_text is not None and self.post_text is not None
+
+    def __call__(self, scripts):
+        while self._checked < len(scripts) and not self.found:
+            text = scripts[self._checked]
+            self._checked += 1
+            if not text:
+                continue
+            if self.thumbnail_text is None and "preferred_thumbnail" in text:
+                self.thumbnail_text = text
+            if self.post_text is None and all(keyword in text for keyword in _POST_SCRIPT_KEYWORDS):
+                self.post_text = text
+        return self.found
+
+
+def _find_video_scripts(scripts):
+    """Returns the first thumbnail script and the first post data script (either may be None)."""
+    search = _VideoScriptSearch()
+    search(scripts)
+    return search.thumbnail_text, search.post_text
+
+
 def _meta_content(soup: BeautifulSoup, prop: str) -> str | None:
     tag = soup.find("meta", {"property": prop})
     if tag and tag.get("content"):
@@ -87,10 +158,11 @@ class Facebook:
             "User-Agent": MOBILE_USER_AGENT,
         }
 
-    def _resolve_watch_url(self) -> str | None:
-        response = requests.get(self.url, headers=self.headers, allow_redirects=True)
-        final_url = str(response.url)
+    def _is_watch_url(self) -> bool:
+        return any(x in self.url for x in ["fb.watch", "/watch/?v", "/watch?"])
 
+    @staticmethod
+    def _reel_url_from(final_url: str) -> str | None:
         if "/videos/" in final_url:
             try:
                 return f"https://www.facebook.com/reel/{final_url.split('/videos/')[1].split('/')[0]}"
@@ -104,8 +176,12 @@ class Facebook:
 
         return final_url if "facebook.com" in final_url else None
 
+    def _resolve_watch_url(self) -> str | None:
+        response = requests.get(self.url, headers=self.headers, allow_redirects=True)
+        return self._reel_url_from(str(response.url))
+
     def getVideo(self):
-        if any(x in self.url for x in ["fb.watch", "/watch/?v", "/watch?"]):
+        if self._is_watch_url():
             resolved_url = self._resolve_watch_url()
             if not resolved_url:
                 return {"error": True, "message": "video not found", "error_message": "unable to resolve watch url"}, 404
@@ -113,61 +189,82 @@ class Facebook:
 
         try:
             resp = requests.get(self.url, headers=self.headers, allow_redirects=True)
-            soup = BeautifulSoup(resp.text, "html.parser")
-            scripts = soup.find_all("script", type="application/json")
+        except Exception as error:
+            return {"error": True, "message": "something went wrong", "error_message": str(error)}, 500
+        return self.process_html(resp.text)
 
-            keywords = ["base_url", "total_comment_count"]
-            preferred_thumbnail, browser_native_hd_url, data, owner, json_data = None, None, None, None, None
+    def process_html(self, html_content: str):
+        try:
+            soup = BeautifulSoup(html_content, "html.parser")
+            scripts = [script.string for script in soup.find_all("script", type="application/json")]
+        except Exception as error:
+            return {"error": True, "message": "something went wrong", "error_message": str(error)}, 500
+        return self.process_scripts(scripts, lambda: soup)
+
+    def process_scripts(self, scripts, load_soup):
+        """Builds the result from the page's application/json script bodies.
 
-            for script in scripts:
-                if script.string and "preferred_thumbnail" in script.string:
-                    json_data = json.loads(script.string)
-                    preferred_thumbnail = get_nested_value(json_data, "preferred_thumbnail")
-                    browser_native_hd_url = get_nested_value(json_data, "browser_native_hd_url")
-                    break
-
-            for script in scripts:
-                if script.string and all(keyword in script.string for keyword in keywords):
-                    json_data = json.loads(script.string)
-                    data = get_nested_value(json_data, "data")
-                    title = (data or {}).get("title") or {}
-                    desc = title.get("text") if isinstance(title, dict) else None
-                    owner = get_nested_value(json_data, "owner_as_page")
-
-                    if owner is None:
-                        owner_main = get_nested_value(data, "owner")
-                        if owner_main is not None:
-                            owner = {"id": owner_main.get("id", None)}
-
-                    if desc is None:
-                        message = get_nested_value(data, "message")
-                        if message is not None:
-                            desc = message.get("text", None)
-                            if isinstance(data.get("title"), dict):
-                                data["title"]["text"] = desc
-                            else:
-                                data["title"] = {"text": desc}
-
-                    if browser_native_hd_url is None:
-                        representations = get_nested_value(json_data, "representations") or []
-                        deaf_media = {}
-                        for representation in representations:
-                            mime_type = representation.get("mime_type", "").lower()
-                            if mime_type and "video" in mime_type:
-                                deaf_media["video_url"] = representation.get("base_url")
-                            elif mime_type and "audio" in mime_type:
-                                deaf_media["audio_url"] = representation.get("base_url")
-                        browser_native_hd_url = deaf_media.get("video_url")
-                        json_data["deaf_media"] = deaf_media
-
-                    json_data["data"] = data
-                    json_data["owner"] = owner
-                    json_data["platform"] = "facebook"
-                    json_data["preferred_thumbnail"] = preferred_thumbnail
-                    break
+        load_soup() is only called when the open graph tags are needed.
+        """
+        try:
+            preferred_thumbnail, browser_native_hd_url, data, owner, json_data = None, None, None, None, None
+            thumbnail_text, post_text = _find_video_scripts(scripts)
+
+            if thumbnail_text is not None:
+                json_data = json.loads(thumbnail_text)
+                found = get_nested_values(json_data, ("preferred_thumbnail", "browser_native_hd_url"))
+                preferred_thumbnail = found["preferred_thumbnail"]
+                browser_native_hd_url = found["browser_native_hd_url"]
+
+            if post_text is not None:
+                # script เดียวกันไม่ต้อง parse ซ้ำ
+                if post_text is not thumbnail_text:
+                    json_data = json.loads(post_text)
+                wanted = ["data", "owner_as_page"]
+                if browser_native_hd_url is None:
+                    wanted.append("representations")
+                found = get_nested_values(json_data, wanted)
+                data = found["data"]
+                title = (data or {}).get("title") or {}
+                desc = title.get("text") if isinstance(title, dict) else None
+                owner = found["owner_as_page"]
+
+                if owner is None or desc is None:
+                    found_in_data = get_nested_values(data, ("owner", "message"))
+
+                if owner is None:
+                    owner_main = found_in_data["owner"]
+                    if owner_main is not None:
+                        owner = {"id": owner_main.get("id", None)}
+
+                if desc is None:
+                    message = found_in_data["message"]
+                    if message is not None:
+                        desc = message.get("text", None)
+                        if isinstance(data.get("title"), dict):
+                            data["title"]["text"] = desc
+                        else:
+                            data["title"] = {"text": desc}
+
+                if browser_native_hd_url is None:
+                    representations = found.get("representations") or []
+                    deaf_media = {}
+                    for representation in representations:
+                        mime_type = representation.get("mime_type", "").lower()
+                        if mime_type and "video" in mime_type:
+                            deaf_media["video_url"] = representation.get("base_url")
+                        elif mime_type and "audio" in mime_type:
+                            deaf_media["audio_url"] = representation.get("base_url")
+                    browser_native_hd_url = deaf_media.get("video_url")
+                    json_data["deaf_media"] = deaf_media
+
+                json_data["data"] = data
+                json_data["owner"] = owner
+                json_data["platform"] = "facebook"
+                json_data["preferred_thumbnail"] = preferred_thumbnail
 
             if data is None or json_data is None:
-                og_data = _extract_from_open_graph(soup)
+                og_data = _extract_from_open_graph(load_soup())
                 if og_data is None:
                     return {"error": True, "message": "post not found!", "error_message": "404 try again"}, 404
                 return og_data, 200
@@ -208,7 +305,7 @@ class Facebook:
                 cut_data["deaf_media"] = json_data["deaf_media"]
 
             if not cut_data["media"][0]["address"]:
-                og_data = _extract_from_open_graph(soup)
+                og_data = _extract_from_open_graph(load_soup())
                 if og_data and og_data["media"][0]["address"]:
                     cut_data["media"][0]["address"] = og_data["media"][0]["address"]
                     if not cut_data["content"]["cover"]:
@@ -225,6 +322,51 @@ class Facebook:
             return {"error": True, "message": "something went wrong", "error_message": str(error)}, 500
 
 
+class FacebookAsync(Facebook):
+    """Facebook ที่ดึงหน้าเว็บผ่าน aiohttp session ที่ใช้ร่วมกัน
+
+    getVideo() เป็น coroutine และคืนค่าแบบเดียวกับ Facebook.getVideo()
+    ยกเว้น network error ที่จะถูก raise ออกไปตรง ๆ เหมือน TikTokAsync.load()
+    """
+
+    def __init__(self, url, session, cut=None):
+        super().__init__(url, cut)
+        self.session = session
+        # HTTP status ของหน้าโพสต์ (None ถ้ายังไม่ได้ response) ไว้แยกว่าแพลตฟอร์มล่มหรือแค่หาโพสต์ไม่เจอ
+        # ส่วน network error จะถูก raise ออกไปตรง ๆ จาก getVideo()
+        self.page_status = None
+
+    async def _resolve_watch_url(self) -> str | None:
+        async with self.session.get(self.url, headers=self.headers, allow_redirects=True) as response:
+            return self._reel_url_from(str(response.url))
+
+    async def getVideo(self):
+        try:
+            if self._is_watch_url():
+                resolved_url = await self._resolve_watch_url()
+                if not resolved_url:
+                    return {"error": True, "message": "video not found", "error_message": "unable to resolve watch url"}, 404
+                self.url = resolved_url
+
+            # อ่านทีละ chunk และหยุดเมื่อได้ทั้ง script thumbnail และ script ข้อมูลโพสต์
+            async with self.session.get(self.url, headers=self.headers, allow_redirects=True) as resp:
+                self.page_status = resp.status
+                page = await read_scripts(
+                    resp,
+                    {"type": "application/json"},
+                    until=_VideoScriptSearch(),
+                )
+        except RETRYABLE_ERRORS:
+            raise
+        except Exception as error:
+            return {"error": True, "message": "something went wrong", "error_message": str(error)}, 500
+        # parse ส่วนหัวของหน้า (meta og:) เฉพาะเมื่อต้องใช้ และทำใน thread แยก
+        return await asyncio.to_thread(
+            self.process_scripts,
+            [script or None for script in page.scripts],
+            lambda: BeautifulSoup(page.html, "html.parser"),
+        )
+
 if __name__ == "__main__":
     fa = Facebook(url="https://web.facebook.com/share/v/iweQG4zGudbW3wh6/", cut=True)
     data = fa.getVideo()
@@ -0,0 +1,72 @@
+import json
+import re
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+_JSON_SCRIPT_PATTERN = re.compile(
+    r'<script\b[^>]*\btype="application/json"[^>]*>(.*?)</script>',
+    re.DOTALL,
+)
+# Shorter "text" values are labels and buttons, never the post body
+MIN_TEXT_LENGTH = 20
+
+
+class GraphIndex:
+    """The embedded GraphQL JSON of a Facebook desktop page, indexed once.
+
+    Every ``<script type="application/json">`` payload is parsed a single
+    time and each object is indexed by the decoder itself (object_hook), so
+    there is no second walk in Python. Only what the post resolvers look up
+    is kept: ``text`` values, the ``name`` of each ``__typename`` and the
+    ``owning_profile`` names. Entries are in decoding order: document order,
+    except that a nested object is indexed before the object containing it.
+    """
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+        self.names_by_typename: Dict[str, List[str]] = {}
+        self.owning_profile_names: List[str] = []
+        self._seen_texts: set[str] = set()
+
+    @classmethod
+    def from_html(cls, html_content: str) -> Optional["GraphIndex"]:
+        """Builds the index, or returns None when the page embeds no parseable JSON."""
+        index = cls()
+        parsed = False
+        for match in _JSON_SCRIPT_PATTERN.finditer(html_content):
+            try:
+                json.loads(match.group(1), object_hook=index._index_object)
+            except ValueError:
+                continue
+            parsed = True
+        return index if parsed else None
+
+    def _index_object(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        text = node.get("text")
+        if isinstance(text, str) and len(text) >= MIN_TEXT_LENGTH and text not in self._seen_texts:
+            self._seen_texts.add(text)
+            self.texts.append(text)
+
+        typename = node.get("__typename")
+        name = node.get("name")
+        if isinstance(typename, str) and isinstance(name, str) and name.strip():
+            self.names_by_typename.setdefault(typename, []).append(name.strip())
+
+        owner = node.get("owning_profile")
+        if isinstance(owner, dict):
+            owner_name = owner.get("name")
+            if isinstance(owner_name, str) and owner_name.strip():
+                self.owning_profile_names.append(owner_name.strip())
+        return node
+
+    @cached_property
+    def texts_by_length(self) -> List[str]:
+        return sorted(self.texts, key=len, reverse=True)
+
+    def entity_name(self, typename: str) -> Optional[str]:
+        names = self.names_by_typename.get(typename)
+        return names[0] if names else None
+
+    @property
+    def owning_profile_name(self) -> Optional[str]:
+        return self.owning_profile_names[0] if self.owning_profile_names else None
@@ -1,30 +1,19 @@
+import asyncio
 import html
 import json
 import re
-from typing import Dict, List, Optional, Union
+from functools import cached_property, lru_cache
+from typing import Dict, List, Optional, Sequence, Union
 
 import aiohttp
 from bs4 import BeautifulSoup
 
-from .utils import json_append
-
-MOBILE_USER_AGENT = (
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
-    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
-)
-DESKTOP_USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-)
-
-FACEBOOK_HEADERS = {
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Sec-Fetch-Dest": "document",
-    "Sec-Fetch-Mode": "navigate",
-    "Sec-Fetch-Site": "none",
-    "Upgrade-Insecure-Requests": "1",
-}
+from .cache import cdn_expiry, media_cache
+from .facebook_graph import GraphIndex
+from .headers import DESKTOP_USER_AGENT, FACEBOOK_CDN_HEADERS, FACEBOOK_HEADERS, MOBILE_USER_AGENT
+from .links import post_cache_key
+from .resilience import PlatformStatusError, is_platform_failure
+from .utils import image_debug
 
 DESKTOP_HEADERS = {
     **FACEBOOK_HEADERS,
@@ -45,19 +34,25 @@ def _build_headers(user_agent: str) -> Dict[str, str]:
     return {**FACEBOOK_HEADERS, "User-Agent": user_agent}
 
 
-def _parse_soup(html_content: str) -> BeautifulSoup:
-    pre_soup = BeautifulSoup(html_content, "html.parser")
-    return BeautifulSoup(html.unescape(pre_soup.prettify()), "html.parser")
+# Every entity except quotes; those stay encoded so they can't end a quoted attribute
+_ENTITY_PATTERN = re.compile(
+    r"&(?!(?:quot|apos|#0*3[49]|#[xX]0*2[27]);)"
+    r"(?:#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[A-Za-z][A-Za-z0-9]*;?)"
+)
 
 
-def _meta_content(soup: BeautifulSoup, prop: str) -> Optional[str]:
-    tag = soup.find("meta", {"property": prop})
-    if tag and tag.get("content"):
-        return tag["content"]
-    tag = soup.find("meta", {"name": prop})
-    if tag and tag.get("content"):
-        return tag["content"]
-    return None
+def _unescape_markup(html_content: str) -> str:
+    """Decodes entities in the raw page before parsing.
+
+    Same result as parsing, prettifying, unescaping and parsing again, which
+    double-decodes entities and turns escaped markup into real tags, but
+    with a single parse.
+    """
+    return _ENTITY_PATTERN.sub(lambda match: html.unescape(match.group(0)), html_content)
+
+
+def _parse_soup(html_content: str) -> BeautifulSoup:
+    return BeautifulSoup(_unescape_markup(html_content), "html.parser")
 
 
 def _clean_owner(title: Optional[str]) -> Optional[str]:
@@ -129,23 +124,23 @@ def _extract_owning_profile_name(html_content: str) -> Optional[str]:
 def _resolve_post_metadata(
     og_title: Optional[str],
     og_desc: Optional[str],
-    desktop_html: Optional[str],
+    desktop: Optional["FacebookPage"],
 ) -> tuple[Optional[str], Optional[str]]:
     """Return (post_owner, post_author). post_author is set for group posts."""
     owner = _clean_owner(og_title)
     if not owner:
         return None, None
 
-    if desktop_html:
-        group_name = _extract_entity_name(desktop_html, "Group")
+    if desktop:
+        group_name = desktop.entity_name("Group")
         if group_name:
-            author = _extract_owning_profile_name(desktop_html)
+            author = desktop.owning_profile_name
             if author and author != group_name:
                 return group_name, author
             return group_name, None
 
         if og_desc and owner == og_desc.strip():
-            page_name = _extract_entity_name(desktop_html, "Page")
+            page_name = desktop.entity_name("Page")
             if page_name:
                 return page_name, None
 
@@ -156,8 +151,18 @@ def _normalize_cdn_url(url: str) -> str:
     return html.unescape(url).strip()
 
 
+_FILE_ID_PATTERN = re.compile(r"/(\d+_\d+(?:_\d+)?)_")
+_CONTENT_DIMENSIONS_PATTERN = re.compile(r"cstp=mx(\d+)x(\d+)")
+_DELIVERY_DIMENSIONS_PATTERN = re.compile(r"ctp=([sp])(\d+)x(\d+)")
+# Kept as two patterns: each starts with a literal, which lets re skip ahead
+# far faster than one alternation of both could
+_SCONTENT_URL_PATTERN = re.compile(r"https://scontent[^\"'<>\s\\]+")
+_JSON_URI_PATTERN = re.compile(r'"uri"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+@lru_cache(maxsize=4096)
 def _facebook_file_id(url: str) -> Optional[str]:
-    match = re.search(r"/(\d+_\d+(?:_\d+)?)_", url)
+    match = _FILE_ID_PATTERN.search(url)
     if match:
         return match.group(1)
     return url.split("?")[0]
@@ -180,8 +185,9 @@ STICKER_PATH_TYPES = (
 )
 
 
+@lru_cache(maxsize=4096)
 def _content_dimensions(url: str) -> Optional[tuple[int, int]]:
-    match = re.search(r"cstp=mx(\d+)x(\d+)", url.lower())
+    match = _CONTENT_DIMENSIONS_PATTERN.search(url.lower())
     if not match:
         return None
     return int(match.group(1)), int(match.group(2))
@@ -198,7 +204,7 @@ def _is_better_image_url(candidate: str, current: str) -> bool:
 
 
 def _delivery_dimensions(url: str) -> Optional[tuple[int, int]]:
-    match = re.search(r"ctp=([sp])(\d+)x(\d+)", url.lower())
+    match = _DELIVERY_DIMENSIONS_PATTERN.search(url.lower())
     if not match:
         return None
     return int(match.group(2)), int(match.group(3))
@@ -209,6 +215,7 @@ def _is_avatar_thumbnail(url: str) -> bool:
     return dims is not None and max(dims) <= 64
 
 
+@lru_cache(maxsize=4096)
 def _is_post_image(url: str) -> bool:
     lowered = url.lower()
     if not url.startswith("http") or url.startswith("data:"):
@@ -270,18 +277,46 @@ def _extract_images_from_img_tags(soup: BeautifulSoup, limit: int = 5) -> List[s
 
 
 def _extract_images_from_regex(html_content: str, limit: int = 5) -> List[str]:
-    pattern = r"https://scontent[^\"'<>\s\\]+"
     images: List[str] = []
+    seen: set[str] = set()
 
-    for match in re.finditer(pattern, html_content):
-        url = _normalize_cdn_url(match.group(0).rstrip("\\"))
-        if not _is_post_image(url):
+    for match in _SCONTENT_URL_PATTERN.finditer(html_content):
+        classified = _classify_cdn_url(match.group(0).rstrip("\\"))
+        if classified is None:
+            continue
+        url, file_id = classified
+        if file_id in seen:
             continue
-        images.append(url)
-        if len(_dedupe_images(images)) >= limit:
+        seen.add(file_id)
+        images.append(_normalize_cdn_url(url))
+        if len(images) >= limit:
             break
 
-    return _dedupe_images(images)[:limit]
+    return images
+
+
+@lru_cache(maxsize=4096)
+def _classify_cdn_url(url: str) -> Optional[tuple[str, str]]:
+    """Returns (normalized URL, file ID) for a post image URL, else None.
+
+    Desktop pages repeat the same CDN URLs many times, so each distinct
+    string is normalized and classified once.
+    """
+    url = _normalize_cdn_url(url)
+    if not _is_post_image(url):
+        return None
+    file_id = _facebook_file_id(url)
+    if not file_id:
+        return None
+    return url, file_id
+
+
+@lru_cache(maxsize=4096)
+def _decode_cdn_uri(value: str) -> Optional[str]:
+    if "scontent" not in value and "\\u" not in value:
+        return None
+    decoded = _decode_json_string(value)
+    return decoded if decoded and "scontent" in decoded else None
 
 
 def _register_image_candidate(
@@ -291,13 +326,10 @@ def _register_image_candidate(
     first_pos: Dict[str, int],
     counts: Dict[str, int],
 ) -> None:
-    url = _normalize_cdn_url(url)
-    if not _is_post_image(url):
-        return
-
-    file_id = _facebook_file_id(url)
-    if not file_id:
+    classified = _classify_cdn_url(url)
+    if classified is None:
         return
+    url, file_id = classified
 
     counts[file_id] = counts.get(file_id, 0) + 1
     first_pos.setdefault(file_id, position)
@@ -320,7 +352,7 @@ def _find_url_position(html_content: str, url: str) -> int:
 def _collect_post_images_from_html(
     html_content: str,
     limit: int = 5,
-    soup: Optional[BeautifulSoup] = None,
+    img_tag_images: Sequence[str] = (),
     overlay: Optional[str] = None,
 ) -> tuple[List[str], int]:
     best_url: Dict[str, str] = {}
@@ -328,20 +360,19 @@ def _collect_post_images_from_html(
     counts: Dict[str, int] = {}
     img_tag_ids: List[str] = []
 
-    if soup:
-        for url in _extract_images_from_img_tags(soup, limit=10):
-            position = _find_url_position(html_content, url)
-            _register_image_candidate(url, position, best_url, first_pos, counts)
-            file_id = _facebook_file_id(url)
-            if file_id:
-                img_tag_ids.append(file_id)
-
-    for match in re.finditer(r'"uri"\s*:\s*"((?:[^"\\]|\\.)*)"', html_content):
-        decoded = _decode_json_string(match.group(1))
-        if decoded and "scontent" in decoded:
+    for url in img_tag_images:
+        position = _find_url_position(html_content, url)
+        _register_image_candidate(url, position, best_url, first_pos, counts)
+        file_id = _facebook_file_id(url)
+        if file_id:
+            img_tag_ids.append(file_id)
+
+    for match in _JSON_URI_PATTERN.finditer(html_content):
+        decoded = _decode_cdn_uri(match.group(1))
+        if decoded:
             _register_image_candidate(decoded, match.start(), best_url, first_pos, counts)
 
-    for match in re.finditer(r"https://scontent[^\"'<>\s\\]+", html_content):
+    for match in _SCONTENT_URL_PATTERN.finditer(html_content):
         _register_image_candidate(
             match.group(0).rstrip("\\"),
             match.start(),
@@ -380,17 +411,6 @@ def _collect_post_images_from_html(
     return [best_url[file_id] for file_id in candidates[:limit]], total
 
 
-def _has_visible_gallery(soup: BeautifulSoup) -> bool:
-    og_image = _meta_content(soup, "og:image")
-    if og_image and _is_post_image(og_image):
-        return True
-    if _extract_images_from_img_tags(soup):
-        return True
-    if _extract_extra_images(soup):
-        return True
-    return False
-
-
 def _overlay_count(overlay: Optional[str]) -> int:
     if not overlay:
         return 0
@@ -485,10 +505,10 @@ def _pick_post_text(candidates: List[str], og_desc: Optional[str]) -> Optional[s
 
 def _resolve_description(
     og_desc: Optional[str],
-    desktop_html: Optional[str],
+    desktop: Optional["FacebookPage"],
 ) -> Optional[str]:
-    if desktop_html:
-        full_text = _pick_post_text(_extract_text_candidates(desktop_html), og_desc)
+    if desktop:
+        full_text = _pick_post_text(desktop.text_candidates, og_desc)
         if full_text:
             return full_text
 
@@ -502,118 +522,273 @@ def _merge_image_lists(*image_lists: List[str]) -> List[str]:
     return _dedupe_images(merged)
 
 
-def _extract_post_data(
-    soup: BeautifulSoup,
-    html_content: str,
-    desktop_html: Optional[str] = None,
-) -> Dict[str, Union[str, List[str], None]]:
-    og_image = _meta_content(soup, "og:image")
-    og_title = _meta_content(soup, "og:title")
-    og_desc = _meta_content(soup, "og:description")
+class FacebookPage:
+    """A fetched Facebook page, parsed once with its derived views memoized.
 
-    mobile_images: List[str] = []
-    if og_image and _is_post_image(og_image):
-        mobile_images.append(_normalize_cdn_url(og_image))
+    The soup and every view built from it (meta tags, img candidates, +N
+    overlay badge, gallery signal) are computed on first use and reused by
+    all later lookups on the same page. Post text and owner names come from
+    the embedded JSON index; each lookup falls back to a raw-HTML regex scan
+    when the index has no answer for it (no JSON, or the value sits in a
+    script the index could not parse).
+    """
 
-    mobile_images.extend(_extract_images_from_img_tags(soup))
+    def __init__(self, html_content: str) -> None:
+        self.html = html_content
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return _parse_soup(self.html)
+
+    @cached_property
+    def _meta_tags(self) -> tuple[Dict[str, Optional[str]], Dict[str, Optional[str]]]:
+        by_property: Dict[str, Optional[str]] = {}
+        by_name: Dict[str, Optional[str]] = {}
+        for tag in self.soup.find_all("meta"):
+            if tag.get("property") is not None:
+                by_property.setdefault(tag["property"], tag.get("content"))
+            if tag.get("name") is not None:
+                by_name.setdefault(tag["name"], tag.get("content"))
+        return by_property, by_name
+
+    def meta(self, prop: str) -> Optional[str]:
+        by_property, by_name = self._meta_tags
+        return by_property.get(prop) or by_name.get(prop) or None
+
+    @property
+    def og_image(self) -> Optional[str]:
+        return self.meta("og:image")
+
+    @property
+    def og_title(self) -> Optional[str]:
+        return self.meta("og:title")
+
+    @property
+    def og_desc(self) -> Optional[str]:
+        return self.meta("og:description")
+
+    @cached_property
+    def img_candidates(self) -> List[str]:
+        """Post images from <img> tags, up to 10; the first 5 are the visible ones."""
+        return _extract_images_from_img_tags(self.soup, limit=10)
+
+    @cached_property
+    def overlay(self) -> Optional[str]:
+        return _extract_extra_images(self.soup)
+
+    @cached_property
+    def post_images(self) -> List[str]:
+        """The og:image and visible <img> images, with a regex scan when those find one or none."""
+        images: List[str] = []
+        og_image = self.og_image
+        if og_image and _is_post_image(og_image):
+            images.append(_normalize_cdn_url(og_image))
+        images.extend(self.img_candidates[:5])
+        if len(_dedupe_images(images)) <= 1:
+            images.extend(_extract_images_from_regex(self.html))
+        return _dedupe_images(images)
+
+    @cached_property
+    def has_visible_gallery(self) -> bool:
+        og_image = self.og_image
+        if og_image and _is_post_image(og_image):
+            return True
+        return bool(self.img_candidates or self.overlay)
+
+    @cached_property
+    def profile_pic(self) -> Optional[str]:
+        return _extract_profile_pic(self.soup)
+
+    @cached_property
+    def graph(self) -> Optional[GraphIndex]:
+        return GraphIndex.from_html(self.html)
+
+    @cached_property
+    def text_candidates(self) -> List[str]:
+        """Distinct post-length "text" values, longest first."""
+        if self.graph is not None and self.graph.texts_by_length:
+            return self.graph.texts_by_length
+        return _extract_text_candidates(self.html)
+
+    def entity_name(self, typename: str) -> Optional[str]:
+        if self.graph is not None:
+            name = self.graph.entity_name(typename)
+            if name:
+                return name
+        return _extract_entity_name(self.html, typename)
+
+    @cached_property
+    def owning_profile_name(self) -> Optional[str]:
+        if self.graph is not None and self.graph.owning_profile_name:
+            return self.graph.owning_profile_name
+        return _extract_owning_profile_name(self.html)
+
+    def is_login_walled(
+        self,
+        post_owner: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> bool:
+        return _is_login_walled(self.og_title, self.og_desc, post_owner, description)
 
-    if len(_dedupe_images(mobile_images)) <= 1:
-        mobile_images.extend(_extract_images_from_regex(html_content))
 
-    mobile_images = _dedupe_images(mobile_images)
-    overlay = _extract_extra_images(soup)
+def _extract_post_data(
+    page: FacebookPage,
+    desktop: Optional[FacebookPage] = None,
+) -> Dict[str, Union[str, List[str], None]]:
+    og_title = page.og_title
+    og_desc = page.og_desc
+    mobile_images = page.post_images
+    overlay = page.overlay
     images = mobile_images
-    has_gallery_signal = _has_visible_gallery(soup)
+    has_gallery_signal = page.has_visible_gallery
 
-    if desktop_html:
-        desktop_soup = _parse_soup(desktop_html)
+    if desktop:
         if not overlay:
-            overlay = _extract_extra_images(desktop_soup)
-        has_gallery_signal = has_gallery_signal or _has_visible_gallery(desktop_soup)
+            overlay = desktop.overlay
+        has_gallery_signal = has_gallery_signal or desktop.has_visible_gallery
 
         if len(mobile_images) <= 1 and has_gallery_signal:
             desktop_images, total_image_count = _collect_post_images_from_html(
-                desktop_html,
-                soup=desktop_soup,
+                desktop.html,
+                img_tag_images=desktop.img_candidates,
                 overlay=overlay,
             )
             if overlay or total_image_count > 1:
                 images = desktop_images if desktop_images else mobile_images
 
     shown_count = 5
-    post_owner, post_author = _resolve_post_metadata(og_title, og_desc, desktop_html)
+    post_owner, post_author = _resolve_post_metadata(og_title, og_desc, desktop)
     return {
         "post_owner": post_owner,
         "post_author": post_author,
-        "profile_pic_url": _extract_profile_pic(soup),
-        "description": _resolve_description(og_desc, desktop_html),
+        "profile_pic_url": page.profile_pic,
+        "description": _resolve_description(og_desc, desktop),
         "images": images[:shown_count],
         "extra_images": _remaining_image_count(overlay, len(images), shown_count),
     }
 
 
+def _analyse_pages(
+    page: FacebookPage,
+    desktop: Optional[FacebookPage] = None,
+) -> tuple[Dict[str, Union[str, List[str], None]], bool]:
+    """Builds the post data and tells whether either page is login-walled."""
+    result = _extract_post_data(page, desktop)
+    login_walled = page.is_login_walled(
+        result.get("post_owner"),
+        result.get("description"),
+    )
+    if not login_walled and desktop:
+        login_walled = desktop.is_login_walled(
+            result.get("post_owner"),
+            result.get("description"),
+        )
+    return result, login_walled
+
+
+def _mobile_page_is_enough(url: str, page: FacebookPage) -> bool:
+    """True when the desktop page could not change the result built from the mobile one.
+
+    Desktop HTML only adds gallery images, the full text of a truncated
+    description and the group/page name, so a login-walled page, or a
+    single-image post with a complete description outside groups and
+    pages, needs no desktop fetch. url must be where the mobile fetch
+    ended up: /share/ links only redirect to their group post.
+    """
+    if page.is_login_walled():
+        return True
+    og_desc = page.og_desc
+    if not og_desc or og_desc.rstrip().endswith("..."):
+        return False
+    if "/groups/" in url or _clean_owner(page.og_title) == og_desc.strip():
+        return False
+    return len(page.post_images) == 1 and len(page.img_candidates) <= 1 and not page.overlay
+
+
 async def _fetch_html(
     session: aiohttp.ClientSession,
     url: str,
     headers: Dict[str, str],
-) -> tuple[int, str]:
+) -> tuple[int, str, str]:
+    """Returns the status, the body and the URL the redirects ended at."""
     async with session.get(url, headers=headers, allow_redirects=True) as response:
-        return response.status, await response.text()
-
-
-FACEBOOK_CDN_HEADERS = {
-    "User-Agent": MOBILE_USER_AGENT,
-    "Referer": "https://www.facebook.com/",
-    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
-}
+        return response.status, await response.text(), str(response.url)
 
 
-async def get_facebook_post_image(url: str) -> Optional[Dict[str, Union[str, List[str], None]]]:
-    """
-    Scrapes image and post information from a Facebook post URL.
+async def _fetch_pages(
+    session: aiohttp.ClientSession,
+    url: str,
+) -> tuple[int, FacebookPage, Optional[int], Optional[FacebookPage]]:
+    """Fetches the mobile and desktop pages concurrently.
 
-    Uses mobile User-Agent for images/metadata and desktop HTML for full post text.
+    The desktop fetch is cancelled as soon as the mobile page alone is
+    enough, so its status is None when it was skipped. The mobile page is
+    parsed for that check in a worker thread while the desktop download
+    goes on.
     """
-    async with aiohttp.ClientSession() as session:
-        mobile_status, mobile_html = await _fetch_html(
+    desktop_task = asyncio.create_task(_fetch_html(session, url, DESKTOP_HEADERS))
+    # a desktop failure only matters if its result is awaited
+    desktop_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    try:
+        mobile_status, mobile_html, mobile_url = await _fetch_html(
             session, url, _build_headers(MOBILE_USER_AGENT)
         )
-        mobile_soup = _parse_soup(mobile_html)
+    except BaseException:
+        desktop_task.cancel()
+        raise
+    mobile_page = FacebookPage(mobile_html)
 
-        desktop_status, desktop_html = await _fetch_html(session, url, DESKTOP_HEADERS)
-        desktop_for_text = desktop_html if desktop_status == 200 else None
+    try:
+        mobile_is_enough = await asyncio.to_thread(_mobile_page_is_enough, mobile_url, mobile_page)
+    except BaseException:
+        desktop_task.cancel()
+        raise
+    if mobile_is_enough:
+        desktop_task.cancel()
+        return mobile_status, mobile_page, None, None
 
-        result = _extract_post_data(mobile_soup, mobile_html, desktop_for_text)
+    desktop_status, desktop_html, _ = await desktop_task
+    desktop_page = FacebookPage(desktop_html) if desktop_status == 200 else None
+    return mobile_status, mobile_page, desktop_status, desktop_page
 
-        og_title = _meta_content(mobile_soup, "og:title")
-        og_desc = _meta_content(mobile_soup, "og:description")
-        login_walled = _is_login_walled(
-            og_title,
-            og_desc,
-            result.get("post_owner"),
-            result.get("description"),
-        )
-        if not login_walled and desktop_for_text:
-            desktop_soup = _parse_soup(desktop_for_text)
-            login_walled = _is_login_walled(
-                _meta_content(desktop_soup, "og:title"),
-                _meta_content(desktop_soup, "og:description"),
-                result.get("post_owner"),
-                result.get("description"),
-            )
 
-        json_append(
-            data={
-                "url": url,
-                "output": result,
-                "mobile_status": mobile_status,
-                "desktop_status": desktop_status,
-                "description_len": len(result["description"] or ""),
-                "login_walled": login_walled,
-            },
-            file="debug_image.json",
-            max_items=20,
-        )
-        if login_walled:
-            return None
-        return result if (result["images"] or result.get("description") or result.get("post_owner")) else None
+async def get_facebook_post_image(
+    session: aiohttp.ClientSession,
+    url: str,
+) -> Optional[Dict[str, Union[str, List[str], None]]]:
+    """
+    Scrapes image and post information from a Facebook post URL.
+
+    Uses mobile User-Agent for images/metadata and desktop HTML for full post text;
+    the desktop page is fetched alongside and dropped when the mobile one is enough.
+    Successful results are cached per post until their CDN image URLs expire.
+    """
+    cache_key = post_cache_key("Facebook", "image", url)
+    cached = await media_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    mobile_status, mobile_page, desktop_status, desktop_page = await _fetch_pages(session, url)
+    if is_platform_failure(mobile_status):
+        raise PlatformStatusError(mobile_status)
+    # soup, JSON index and regex passes over multi-megabyte pages stay off the event loop
+    result, login_walled = await asyncio.to_thread(_analyse_pages, mobile_page, desktop_page)
+
+    image_debug.record({
+        "url": url,
+        "output": result,
+        "mobile_status": mobile_status,
+        "desktop_status": desktop_status,
+        "description_len": len(result["description"] or ""),
+        "login_walled": login_walled,
+    })
+    if login_walled:
+        return None
+    if not (result["images"] or result.get("description") or result.get("post_owner")):
+        return None
+    media_cache.set(
+        cache_key,
+        result,
+        expires_at=cdn_expiry([*result["images"], result.get("profile_pic_url")]),
+    )
+    return result
@@ -0,0 +1,106 @@
+import codecs
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+_SCRIPT_OPEN = re.compile(r"<script\b([^>]*)>", re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile(r"</script\s*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_attributes(text: str) -> Dict[str, str]:
+    return {
+        match.group(1).lower(): match.group(2) or match.group(3) or match.group(4) or ""
+        for match in _ATTRIBUTE.finditer(text)
+    }
+
+
+@dataclass
+class StreamedScripts:
+    """Script bodies captured from a page, with the part of the page read to get them."""
+
+    status: int
+    scripts: List[str] = field(default_factory=list)
+    html: str = ""
+
+
+class ScriptScanner:
+    """Incrementally finds <script> blocks whose attributes match in streamed HTML.
+
+    feed() takes decoded text as it arrives and returns nothing; scripts
+    lists the bodies of the matching scripts completed so far, in document
+    order. A tag or body split across chunks is picked up on a later feed.
+    """
+
+    def __init__(self, attributes: Dict[str, str]) -> None:
+        self.attributes = attributes
+        self.scripts: List[str] = []
+        self._text = ""
+        self._pos = 0
+        self._open: Optional[re.Match] = None
+
+    @property
+    def html(self) -> str:
+        return self._text
+
+    def _matches(self, tag: re.Match) -> bool:
+        attributes = _parse_attributes(tag.group(1))
+        return all(attributes.get(name) == value for name, value in self.attributes.items())
+
+    def feed(self, text: str) -> None:
+        self._text += text
+        while True:
+            if self._open is None:
+                self._open = _SCRIPT_OPEN.search(self._text, self._pos)
+                if self._open is None:
+                    # keep an unfinished "<script ..." for the next chunk
+                    last_tag = self._text.rfind("<", self._pos)
+                    self._pos = last_tag if last_tag >= 0 else len(self._text)
+                    return
+                self._pos = self._open.end()
+
+            # a closing tag split across chunks can only start in the last few characters
+            close = _SCRIPT_CLOSE.search(self._text, self._pos)
+            if close is None:
+                self._pos = max(self._pos, len(self._text) - 16)
+                return
+            if self._matches(self._open):
+                self.scripts.append(self._text[self._open.end():close.start()])
+            self._open = None
+            self._pos = close.end()
+
+
+async def read_scripts(
+    response: aiohttp.ClientResponse,
+    attributes: Dict[str, str],
+    until: Callable[[List[str]], bool],
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamedScripts:
+    """Reads a page in chunks, capturing scripts with the given attributes.
+
+    until is called with all scripts so far each time a new matching
+    script completes, so it should only look at the new ones. Reading
+    stops, and the connection is dropped instead of draining the rest of
+    the body, as soon as it returns True.
+    """
+    result = StreamedScripts(status=response.status)
+    decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+    scanner = ScriptScanner(attributes)
+    checked = 0
+    async for chunk in response.content.iter_chunked(chunk_size):
+        scanner.feed(decoder.decode(chunk))
+        if len(scanner.scripts) == checked:
+            continue
+        checked = len(scanner.scripts)
+        if until(scanner.scripts):
+            response.close()
+            break
+    else:
+        scanner.feed(decoder.decode(b"", final=True))
+
+    result.scripts = scanner.scripts
+    result.html = scanner.html
+    return result
@@ -0,0 +1,98 @@
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+
+class HttpClient:
+    """The bot's single pooled HTTP client for scrapers and CDN downloads.
+
+    One keep-alive connector is shared by every request, with a total and a
+    per-host connection limit and cached DNS lookups. Cookies are not kept
+    between requests. Request and connection counters from aiohttp tracing
+    are exposed through stats().
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_seconds: int = 300,
+        keepalive_timeout: float = 30.0,
+        total_timeout: float = 60.0,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.in_flight: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+
+    async def start(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_seconds,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+            # each scrape starts without cookies, as a fresh session per post did before
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trace_configs=[self._trace_config()],
+        )
+        return self.session
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+            context.host = params.url.host or ""
+            self.in_flight[context.host] += 1
+            self.counters["requests"] += 1
+
+        async def on_request_done(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+            host = getattr(context, "host", "")
+            self.in_flight[host] -= 1
+            if self.in_flight[host] <= 0:
+                del self.in_flight[host]
+
+        async def on_request_exception(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+            self.counters["errors"] += 1
+            await on_request_done(session, context, params)
+
+        def count(name: str):
+            async def handler(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+                self.counters[name] += 1
+            return handler
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_done)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(count("new_connections"))
+        trace.on_connection_reuseconn.append(count("reused_connections"))
+        trace.on_connection_queued_start.append(count("queued_for_connection"))
+        trace.on_dns_cache_hit.append(count("dns_cache_hits"))
+        trace.on_dns_cache_miss.append(count("dns_cache_misses"))
+        return trace
+
+    def stats(self) -> Dict[str, Any]:
+        new = self.counters["new_connections"]
+        reused = self.counters["reused_connections"]
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_flight": sum(self.in_flight.values()),
+            "in_flight_by_host": dict(self.in_flight.most_common(5)),
+            "connection_reuse_rate": round(reused / (new + reused), 3) if new + reused else None,
+            **self.counters,
+        }
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
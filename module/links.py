@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+_LINK_PATTERN = re.compile(r"https?://[^\s]*?(?:(?:tiktok\.com|facebook\.com|fb\.watch)/\S*)")
+# TikTok links need a path segment after the host (video, photo or short link)
+_TIKTOK_POST = re.compile(r"tiktok\.com/.*/")
+_FACEBOOK_POST = re.compile(r"facebook\.com/|fb\.watch/")
+_FACEBOOK_VIDEO_HINTS = (
+    "fb.watch", "/watch", "/reel/", "/videos/", "video.php", "story.php", "/share/v/", "/share/r/"
+)
+_FACEBOOK_WATCH_HINTS = ("fb.watch", "/watch/?v")
+
+_TIKTOK_ID = re.compile(r"/(?:video|photo)/(\d+)")
+_FACEBOOK_ID_PATTERNS = (
+    re.compile(r"/reel/(\d+)"),
+    re.compile(r"/videos/(?:[^/?#]+/)?(\d+)"),
+    re.compile(r"/share/[prv]/([A-Za-z0-9_-]+)"),
+    re.compile(r"/posts/([A-Za-z0-9_-]+)"),
+    re.compile(r"/permalink/(\d+)"),
+)
+_FACEBOOK_ID_PARAMS = ("story_fbid", "fbid", "v")
+
+
+def _bare_url(url: str) -> str:
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().removeprefix("www.").removeprefix("m.").removeprefix("web.")
+    return f"{host}{parsed.path.rstrip('/')}"
+
+
+def canonical_post_id(platform: str, url: str) -> str:
+    """Returns a stable ID for the post a link points at.
+
+    Falls back to the link without scheme, query string and trailing slash
+    when the URL carries no post ID (e.g. vm.tiktok.com short links).
+    """
+    if platform == "TikTok":
+        match = _TIKTOK_ID.search(url)
+        if match:
+            return match.group(1)
+        return _bare_url(url)
+
+    if platform == "Facebook":
+        for pattern in _FACEBOOK_ID_PATTERNS:
+            match = pattern.search(url)
+            if match:
+                return match.group(1)
+        query = parse_qs(urlparse(url).query)
+        for param in _FACEBOOK_ID_PARAMS:
+            value = query.get(param, [None])[0]
+            if value:
+                return value
+    return _bare_url(url)
+
+
+def post_cache_key(platform: str, kind: str, url: str) -> str:
+    """Cache key for one kind of resolved data (e.g. "video", "image") of a post."""
+    return f"{platform.lower()}:{kind}:{canonical_post_id(platform, url)}"
+
+
+def url_expiry(url: Optional[str]) -> Optional[float]:
+    """Returns the unix time a signed CDN URL stops working, if it says so.
+
+    fbcdn URLs carry ``oe`` as a hex timestamp; TikTok URLs carry
+    ``expire`` or ``x-expires`` in seconds.
+    """
+    if not url:
+        return None
+    query = parse_qs(urlparse(url).query)
+    try:
+        if "oe" in query:
+            return float(int(query["oe"][0], 16))
+        for param in ("expire", "x-expires"):
+            if param in query:
+                return float(query[param][0])
+    except ValueError:
+        return None
+    return None
+
+
+@dataclass
+class Link:
+    """A supported link found in a message.
+
+    kind is "video", "photo" or "short" for TikTok and "watch", "video" or
+    "post" for Facebook. "watch" links must be redirected before use.
+    """
+
+    url: str
+    platform: str
+    kind: str
+    is_video: bool
+
+
+def classify_link(url: str) -> Optional[Link]:
+    """Classifies a single URL, or returns None if it is not a supported post link."""
+    if _TIKTOK_POST.search(url):
+        if "/video/" in url:
+            return Link(url, "TikTok", "video", True)
+        if "/photo/" in url:
+            return Link(url, "TikTok", "photo", False)
+        return Link(url, "TikTok", "short", True)
+
+    if not _FACEBOOK_POST.search(url):
+        return None
+    is_video = any(hint in url for hint in _FACEBOOK_VIDEO_HINTS)
+    if any(hint in url for hint in _FACEBOOK_WATCH_HINTS):
+        kind = "watch"
+    else:
+        kind = "video" if is_video else "post"
+    return Link(url, "Facebook", kind, is_video)
+
+
+def scan_links(content: str) -> List[Link]:
+    """Finds and classifies every supported link in a message, in order.
+
+    Plain substring checks reject the common case (no supported host in
+    the message) before any regex runs.
+    """
+    if "://" not in content:
+        return []
+    if "tiktok.com" not in content and "facebook.com" not in content and "fb.watch" not in content:
+        return []
+    links: List[Link] = []
+    for match in _LINK_PATTERN.finditer(content):
+        link = classify_link(match.group(0))
+        if link is not None:
+            links.append(link)
+    return links
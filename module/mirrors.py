@@ -0,0 +1,98 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class MirrorHealth:
+    """Rolling outcomes and embed latencies for one mirror domain."""
+
+    def __init__(self, window: int) -> None:
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.last_attempt = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace smoothing so an unseen mirror starts at 0.5, not 0 or 1
+        return (sum(self.outcomes) + 1) / (len(self.outcomes) + 2)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class MirrorManager:
+    """Orders embed mirrors by recent health and sizes their probe timeouts.
+
+    Mirrors are tried healthiest first. Each probe waits for roughly the
+    mirror's observed p95 embed latency instead of a fixed timeout. A mirror
+    that keeps failing is benched and only re-probed every probe_interval
+    seconds, so an outage stops costing every link a full timeout.
+    """
+
+    def __init__(
+        self,
+        domains: List[str],
+        window: int = 50,
+        default_timeout: float = 10.0,
+        min_timeout: float = 3.0,
+        max_timeout: float = 10.0,
+        min_samples: int = 5,
+        bench_below: float = 0.15,
+        probe_interval: float = 60.0,
+    ) -> None:
+        self.domains = list(domains)
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.bench_below = bench_below
+        self.probe_interval = probe_interval
+        self._health: Dict[str, MirrorHealth] = {domain: MirrorHealth(window) for domain in self.domains}
+
+    def _is_benched(self, health: MirrorHealth) -> bool:
+        return len(health.outcomes) >= self.min_samples and health.success_rate < self.bench_below
+
+    def ordered(self) -> List[str]:
+        """Returns the mirrors to try, healthiest and fastest first."""
+        now = time.monotonic()
+        candidates = []
+        for position, domain in enumerate(self.domains):
+            health = self._health[domain]
+            if self._is_benched(health) and now - health.last_attempt < self.probe_interval:
+                continue
+            median = health.percentile(0.5)
+            candidates.append((-health.success_rate, median if median is not None else self.default_timeout, position, domain))
+        return [domain for *_, domain in sorted(candidates)]
+
+    def timeout_for(self, domain: str) -> float:
+        health = self._health[domain]
+        p95 = health.percentile(0.95)
+        if p95 is None or len(health.latencies) < self.min_samples:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, p95 * 1.5))
+
+    def start(self, domain: str) -> None:
+        self._health[domain].last_attempt = time.monotonic()
+
+    def record(self, domain: str, success: bool, latency: Optional[float] = None) -> None:
+        health = self._health[domain]
+        health.outcomes.append(success)
+        if success and latency is not None:
+            health.latencies.append(latency)
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            domain: {
+                "success_rate": round(health.success_rate, 3),
+                "samples": len(health.outcomes),
+                "p50": health.percentile(0.5),
+                "p95": health.percentile(0.95),
+                "timeout": self.timeout_for(domain),
+                "benched": self._is_benched(health),
+            }
+            for domain, health in self._health.items()
+        }
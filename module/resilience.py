@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional, Tuple, Type, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class PlatformStatusError(Exception):
+    """Raised by a scraper when the platform answers 429 or 5xx."""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(f"platform responded with status {status}")
+        self.status = status
+
+
+# Errors worth another attempt; anything else is a bug and is raised at once.
+# They are also the only outcomes that count as failures for a circuit breaker.
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    PlatformStatusError,
+)
+
+
+def is_platform_failure(status: Optional[int]) -> bool:
+    """True for HTTP statuses that mean the platform itself is failing.
+
+    Anything else, including 404 and login walls, is an answer about the
+    post and says nothing about the platform's health.
+    """
+    return status is not None and (status == 429 or status >= 500)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a platform whose circuit breaker is open."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"circuit breaker for {name} is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Fails calls to a platform fast after it fails several times in a row.
+
+    After failure_threshold consecutive failed calls the breaker opens and
+    allow() refuses every call for reset_timeout seconds. Then a single
+    probe call is let through (half open): its success closes the breaker,
+    its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        """Ends a call without an outcome, e.g. one that hit a bug or was cancelled."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == "open" and self.opened_at is not None:
+            retry_in = round(self.reset_timeout - (time.monotonic() - self.opened_at), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": retry_in,
+        }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per platform, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            self._breakers[name] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter: attempt n waits between half and all of base * 2**(n-1)."""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[Optional[T]]],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Optional[T]:
+    """Calls until it returns something other than None, backing off between attempts.
+
+    Retryable errors count as a None result and the error is raised if the
+    last attempt failed with it. The breaker sees one outcome per
+    call_with_retry, not per attempt, and stops the retries early if it
+    opens meanwhile: a failure only when the last attempt hit a retryable
+    error, a success when the platform answered, even with nothing (None).
+    Raises CircuitOpenError without calling when the breaker is open.
+    """
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(breaker.name)
+
+    answered = False
+    last_error: Optional[BaseException] = None
+    try:
+        for attempt in range(policy.attempts):
+            if attempt:
+                if breaker is not None and breaker.state == "open":
+                    break
+                await asyncio.sleep(policy.backoff(attempt))
+            answered, last_error = False, None
+            try:
+                result = await call()
+            except RETRYABLE_ERRORS as error:
+                last_error = error
+                continue
+            answered, last_error = True, None
+            if result is not None:
+                return result
+    finally:
+        # also on unexpected errors and cancellation, so a half-open probe is never left hanging
+        if breaker is not None:
+            if answered:
+                breaker.record_success()
+            elif last_error is not None:
+                breaker.record_failure()
+            else:
+                breaker.release()
+
+    if last_error is not None:
+        raise last_error
+    return None
+
+
+circuit_breakers = CircuitBreakers()
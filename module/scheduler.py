@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Iterable, List, Literal, Optional, Tuple
+
+from .links import Link
+
+PriorityClass = Literal["mirror", "video", "gallery"]
+# Served in this order: a free slot goes to the cheapest waiting class,
+# unless a heavier class has waited longer than LinkScheduler.max_wait
+PRIORITY_CLASSES: Tuple[PriorityClass, ...] = ("mirror", "video", "gallery")
+
+
+def link_priority(link: Link) -> PriorityClass:
+    """Classifies a link by how heavy its conversion is.
+
+    TikTok links are usually answered by a mirror embed; Facebook videos
+    need a scrape; other Facebook posts need a scrape plus image downloads.
+    """
+    if link.platform == "TikTok":
+        return "mirror"
+    if link.is_video:
+        return "video"
+    return "gallery"
+
+
+def message_priority(links: Iterable[Link]) -> PriorityClass:
+    """The class of the heaviest link, shared by every link of a message.
+
+    Links of one message reply in order and wait for each other, so they
+    must not be split across classes.
+    """
+    ranks = [PRIORITY_CLASSES.index(link_priority(link)) for link in links]
+    return PRIORITY_CLASSES[max(ranks, default=0)]
+
+
+class LinkScheduler:
+    """A global pool of conversion slots shared fairly between guilds.
+
+    Waiters are queued per priority class and, within a class, per guild.
+    A freed slot goes to the cheapest class with waiters, and inside it the
+    guilds take turns (round robin), so a guild pasting dozens of links
+    only ever holds its turn in the rotation, not the whole pool. A waiter
+    older than max_wait seconds is served first whatever its class, so a
+    steady stream of cheap links cannot starve the heavier classes.
+    """
+
+    def __init__(self, workers: int, max_wait: float = 30.0) -> None:
+        self.workers = max(1, workers)
+        self.max_wait = max_wait
+        self.running = 0
+        # each waiter is (enqueued at, future), oldest first within a guild
+        self._queues: Dict[PriorityClass, Dict[Hashable, Deque[Tuple[float, asyncio.Future]]]] = {
+            priority: {} for priority in PRIORITY_CLASSES
+        }
+        # guilds with waiters in each class, in turn order
+        self._rotations: Dict[PriorityClass, Deque[Hashable]] = {
+            priority: deque() for priority in PRIORITY_CLASSES
+        }
+        self.started: Dict[PriorityClass, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        self.promoted = 0
+        self.max_depth = 0
+        self._total_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        return sum(len(waiters) for queues in self._queues.values() for waiters in queues.values())
+
+    @asynccontextmanager
+    async def slot(self, guild: Hashable, priority: PriorityClass) -> AsyncIterator[None]:
+        """Waits for a slot in the guild's turn and holds it for the block."""
+        enqueued = time.monotonic()
+        if self.running < self.workers and not any(self._rotations.values()):
+            self.running += 1
+        else:
+            await self._wait(guild, priority, enqueued)
+        self.started[priority] += 1
+        self._total_wait += time.monotonic() - enqueued
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _wait(self, guild: Hashable, priority: PriorityClass, enqueued: float) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        queues = self._queues[priority]
+        if guild not in queues:
+            queues[guild] = deque()
+            self._rotations[priority].append(guild)
+        queues[guild].append((enqueued, waiter))
+        self.max_depth = max(self.max_depth, self.depth)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait was cancelled
+                self._release()
+            else:
+                self._discard(guild, priority, waiter)
+            raise
+
+    def _discard(self, guild: Hashable, priority: PriorityClass, waiter: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(guild)
+        if waiters is None:
+            return
+        for entry in waiters:
+            if entry[1] is waiter:
+                waiters.remove(entry)
+                break
+        if not waiters:
+            del self._queues[priority][guild]
+            self._rotations[priority].remove(guild)
+
+    def _oldest(self, priority: PriorityClass) -> Optional[float]:
+        """When the longest waiting entry of a class was queued, if it has any."""
+        queues = self._queues[priority]
+        return min((queues[guild][0][0] for guild in self._rotations[priority]), default=None)
+
+    def _next_class(self) -> Optional[PriorityClass]:
+        waiting = [priority for priority in PRIORITY_CLASSES if self._rotations[priority]]
+        if not waiting:
+            return None
+        # a class whose oldest waiter waited too long jumps the queue, oldest first
+        deadline = time.monotonic() - self.max_wait
+        overdue = [
+            (oldest, priority) for priority in waiting[1:]
+            if (oldest := self._oldest(priority)) is not None and oldest <= deadline
+        ]
+        if overdue and min(overdue)[0] < (self._oldest(waiting[0]) or float("inf")):
+            self.promoted += 1
+            return min(overdue)[1]
+        return waiting[0]
+
+    def _release(self) -> None:
+        """Hands the freed slot straight to the next waiter, if any."""
+        while (priority := self._next_class()) is not None:
+            rotation = self._rotations[priority]
+            guild = rotation.popleft()
+            waiters = self._queues[priority][guild]
+            _, waiter = waiters.popleft()
+            if waiters:
+                rotation.append(guild)
+            else:
+                del self._queues[priority][guild]
+            # a cancelled waiter is still queued until its task runs again
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        started = sum(self.started.values())
+        now = time.monotonic()
+        queued: Dict[str, int] = {}
+        oldest_wait: Dict[str, Optional[float]] = {}
+        waiting_guilds: List[Hashable] = []
+        for priority in PRIORITY_CLASSES:
+            queued[priority] = sum(len(waiters) for waiters in self._queues[priority].values())
+            oldest = self._oldest(priority)
+            oldest_wait[priority] = round(now - oldest, 3) if oldest is not None else None
+            waiting_guilds.extend(self._rotations[priority])
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": queued,
+            "oldest_wait_seconds": oldest_wait,
+            "waiting_guilds": len(set(waiting_guilds)),
+            "max_depth": self.max_depth,
+            "started": dict(self.started),
+            "promoted": self.promoted,
+            "avg_wait_seconds": round(self._total_wait / started, 3) if started else None,
+        }
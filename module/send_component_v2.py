@@ -1,17 +1,23 @@
-from typing import Literal
+from typing import BinaryIO, Literal
 import asyncio
+import io
 import html
 import json
 import logging
 from logging import Logger
 import aiohttp
 import os
+import tempfile
 from urllib.parse import urlparse
 import time
 import discord
 
-from module.facebook_image import FACEBOOK_CDN_HEADERS, get_facebook_post_image, _is_login_walled
+from module.facebook_image import get_facebook_post_image, _is_login_walled
 from .component_v2 import ComponentV2Builder
+from .headers import FACEBOOK_CDN_HEADERS
+from .links import post_cache_key
+from .resilience import RETRYABLE_ERRORS, CircuitOpenError, RetryPolicy, call_with_retry, circuit_breakers
+from .singleflight import resolution_flights
 
 logger: Logger = logging.getLogger("discord")
 
@@ -24,6 +30,20 @@ ERROR_MESSAGE = (
     "-# *This message will be deleted in 30 seconds.*"
 )
 ERROR_DELETE_AFTER_SECONDS = 30
+FACEBOOK_SCRAPE_RETRY = RetryPolicy(attempts=3, base_delay=0.5)
+# Gallery images download concurrently, bounded per post and across the bot.
+# The bot-wide cap stays within HttpClient's limit_per_host (10), so image
+# downloads never queue for a pooled CDN connection while their timeout runs.
+IMAGE_DOWNLOADS_PER_POST = 3
+IMAGE_DOWNLOAD_SLOTS = asyncio.Semaphore(int(os.environ.get("GLOBAL_IMAGE_DOWNLOADS", 10)))
+IMAGE_DOWNLOAD_TIMEOUT_SECONDS = 15
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+# Discord edits can carry up to 5 images of MAX_IMAGE_BYTES, far longer than
+# the shared session's default timeout allows
+DISCORD_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=300)
+# Images up to this size stay in memory; larger ones are spooled to a temp file
+IMAGE_SPOOL_THRESHOLD = 512 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
 NO_MENTIONS_PAYLOAD = {
     "parse": [],
     "replied_user": False,
@@ -54,46 +74,145 @@ async def edit_facebook_error_reply(reply_message: discord.Message) -> None:
     await reply_message.edit(
         content=ERROR_MESSAGE,
         allowed_mentions=discord.AllowedMentions.none(),
+        delete_after=ERROR_DELETE_AFTER_SECONDS,
     )
-    await asyncio.sleep(ERROR_DELETE_AFTER_SECONDS)
-    await reply_message.delete()
+
+async def _spool_body(
+    response: aiohttp.ClientResponse,
+    max_bytes: int,
+) -> BinaryIO | None:
+    """Reads a response body into a file object, or None if it exceeds max_bytes.
+
+    The body is buffered in memory until it passes IMAGE_SPOOL_THRESHOLD and
+    is then moved to an anonymous temp file, so a large image costs at most
+    the threshold plus one chunk of memory.
+    """
+    buffer = bytearray()
+    spool: BinaryIO | None = None
+    size = 0
+    try:
+        async for chunk in response.content.iter_chunked(IMAGE_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                if spool is not None:
+                    spool.close()
+                return None
+            if spool is not None:
+                await asyncio.to_thread(spool.write, chunk)
+                continue
+            buffer.extend(chunk)
+            if len(buffer) > IMAGE_SPOOL_THRESHOLD:
+                spool = await asyncio.to_thread(tempfile.TemporaryFile)
+                await asyncio.to_thread(spool.write, buffer)
+                buffer = bytearray()
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+
+    if spool is None:
+        return io.BytesIO(buffer)
+    spool.seek(0)
+    return spool
 
 async def download_image(
     session: aiohttp.ClientSession,
     url: str,
     headers: dict[str, str] | None = None,
-) -> tuple[bytes, str] | tuple[None, None]:
-    """Downloads an image from a URL and returns its bytes and filename.
+    timeout: float = IMAGE_DOWNLOAD_TIMEOUT_SECONDS,
+    max_bytes: int = MAX_IMAGE_BYTES,
+) -> tuple[BinaryIO, str] | tuple[None, None]:
+    """Downloads an image from a URL and returns it as a file object with its filename.
+
+    Small images are kept in memory and large ones in a temp file; the
+    caller must close the returned file.
 
     Args:
         session (aiohttp.ClientSession): Active aiohttp session for making requests
         url (str): URL of the image to download
         headers (dict[str, str] | None): Optional request headers
+        timeout (float): Seconds allowed for the whole download
+        max_bytes (int): Images larger than this are abandoned
 
     Returns:
-        tuple[bytes, str] | tuple[None, None]: A tuple containing:
-            - bytes | None: Image data in bytes if successful, None if failed
+        tuple[BinaryIO, str] | tuple[None, None]: A tuple containing:
+            - BinaryIO | None: Image data positioned at its start if successful, None if failed
             - str | None: Filename if successful, None if failed
     """
     url = html.unescape(url).strip()
+    image_file: BinaryIO | None = None
     try:
-        async with session.get(url, headers=headers) as response:
+        async with session.get(
+            url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
             if response.status == 200:
-                # ดึงข้อมูลรูปภาพเป็น bytes
-                image_bytes = await response.read()
+                # อ่านรูปทีละ chunk แต่เลิกทันทีถ้าใหญ่เกิน max_bytes
+                if (response.content_length or 0) > max_bytes:
+                    logger.warning("Image too large: bytes=%s url=%s", response.content_length, url[:120])
+                    return None, None
+                image_file = await _spool_body(response, max_bytes)
+                if image_file is None:
+                    logger.warning("Image too large: bytes>%s url=%s", max_bytes, url[:120])
+                    return None, None
                 # พยายามดึงชื่อไฟล์จาก URL
                 path = urlparse(url).path
                 filename = os.path.basename(path).split('?')[0] # เอาแค่ชื่อไฟล์ ตัด query string ออก
                 if not filename: # ถ้าไม่มีชื่อไฟล์ใน URL ก็ตั้งชื่อเอง
                     filename = f"downloaded_image_{int(time.time())}.jpg"
-                return image_bytes, filename
+                return image_file, filename
             else:
                 logger.warning("Failed to download image: status=%s url=%s", response.status, url[:120])
                 return None, None
-    except Exception as e:
+    except BaseException as e:
+        # ปิดไฟล์ที่ spool ไว้แล้ว ถ้าพังหรือถูกยกเลิกตอนปิด response
+        if image_file is not None:
+            image_file.close()
+        if not isinstance(e, Exception):
+            raise
         logger.warning("Failed to download image: %s url=%s", e, url[:120])
         return None, None
 
+async def download_images(
+    session: aiohttp.ClientSession,
+    urls: list[str],
+    headers: dict[str, str] | None = None,
+) -> list[tuple[str, BinaryIO]]:
+    """Downloads gallery images concurrently and returns (filename, file) in gallery order.
+
+    Args:
+        session (aiohttp.ClientSession): Active aiohttp session for making requests
+        urls (list[str]): Image URLs in gallery order
+        headers (dict[str, str] | None): Optional request headers
+
+    Returns:
+        list[tuple[str, BinaryIO]]: The images that downloaded, each filename
+        prefixed with its gallery position so names stay unique
+    """
+    post_slots = asyncio.Semaphore(IMAGE_DOWNLOADS_PER_POST)
+
+    async def download(url: str) -> tuple[BinaryIO, str] | tuple[None, None]:
+        async with post_slots, IMAGE_DOWNLOAD_SLOTS:
+            return await download_image(session, url, headers)
+
+    tasks = [asyncio.ensure_future(download(url)) for url in urls]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # ถูกยกเลิกกลางทาง ปิดไฟล์ของรูปที่โหลดเสร็จไปแล้ว ไม่ให้ค้างอยู่
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None:
+                image_file, _ = task.result()
+                if image_file is not None:
+                    image_file.close()
+        raise
+    return [
+        (f"{i}_{filename}", image_file)
+        for i, (image_file, filename) in enumerate(results)
+        if image_file is not None and filename
+    ]
+
 async def send_facebook_video(
     discord_bot_token: str, 
     message: discord.Message,
@@ -126,7 +245,9 @@ async def send_facebook_video(
     payload["content"] = ""
     payload["allowed_mentions"] = NO_MENTIONS_PAYLOAD
     request_url = _message_edit_url(channel_id, reply_message.id)
-    async with session.patch(request_url, json=payload, headers=headers) as resp:
+    async with session.patch(
+        request_url, json=payload, headers=headers, timeout=DISCORD_REQUEST_TIMEOUT
+    ) as resp:
         if resp.status in [200, 201]:
             return True, resp.status, ""
         error_msg = await resp.text()
@@ -138,12 +259,60 @@ async def send_facebook_video(
         )
         return False, resp.status, error_msg
 
+async def fetch_facebook_post(
+    session: aiohttp.ClientSession,
+    facebook_url: str,
+) -> tuple[dict | None, int, str]:
+    """Scrapes a Facebook image post, ready for send_facebook_image.
+
+    Args:
+        session (aiohttp.ClientSession): Active aiohttp session for making requests
+        facebook_url (str): URL of the Facebook post containing images
+
+    Returns:
+        tuple[dict | None, int, str]: A tuple containing:
+            - dict | None: The post data, None if it can't be shown
+            - int: HTTP-like status code
+            - str: Error message if the scrape failed, empty string if successful
+    """
+    try:
+        # โพสต์เดียวกันที่ถูกส่งมาพร้อมกันหลายที่ ใช้ผล scrape ชุดเดียวกัน
+        post_data = await resolution_flights.do(
+            post_cache_key("Facebook", "image", facebook_url),
+            lambda: call_with_retry(
+                lambda: get_facebook_post_image(session, facebook_url),
+                FACEBOOK_SCRAPE_RETRY,
+                circuit_breakers.get("Facebook"),
+            ),
+        )
+    except CircuitOpenError:
+        logger.warning("Facebook circuit breaker is open, skipping scrape: url=%s", facebook_url)
+        return None, 503, "Facebook is failing, scrape skipped."
+    except RETRYABLE_ERRORS as error:
+        logger.error("Facebook image scrape failed: %s url=%s", error, facebook_url)
+        return None, 502, "Failed to get image form Facebook link."
+
+    if post_data is None:
+        logger.error("Facebook image scrape failed after retries: url=%s", facebook_url)
+        return None, 400, "Failed to get image form Facebook link."
+
+    if _is_login_walled(
+        None,
+        None,
+        post_data.get("post_owner"),
+        post_data.get("description"),
+    ):
+        logger.warning("Facebook post is login-walled: url=%s", facebook_url)
+        return None, 403, "Facebook post is not accessible."
+    return post_data, 200, ""
+
 async def send_facebook_image(
     discord_bot_token: str, 
     message: discord.Message,
     reply_message: discord.Message,
     session: aiohttp.ClientSession, 
-    facebook_url: str
+    facebook_url: str,
+    post_data: dict,
 ) -> tuple[bool, int, str]:
     """Sends a Facebook image post as a message in Discord using the Discord API.
 
@@ -152,6 +321,7 @@ async def send_facebook_image(
         message (discord.Message): The Discord message to reply to
         session (aiohttp.ClientSession): Active aiohttp session for making requests
         facebook_url (str): URL of the Facebook post containing images
+        post_data (dict): The post as returned by fetch_facebook_post
 
     Returns:
         tuple[bool, int, str]: A tuple containing:
@@ -164,32 +334,6 @@ async def send_facebook_image(
     headers = {
         "Authorization": f"Bot {discord_bot_token}"
     }
-    max_retrys = 3
-    current_retrys = 0
-    post_data = None
-    while post_data is None and current_retrys < max_retrys:
-        post_data = await get_facebook_post_image(facebook_url)
-        if post_data is None:
-            current_retrys += 1
-            logger.warning(
-                "Facebook image scrape returned no data: url=%s retry=%s/%s",
-                facebook_url,
-                current_retrys,
-                max_retrys,
-            )
-
-    if post_data is None:
-        logger.error("Facebook image scrape failed after retries: url=%s", facebook_url)
-        return False, 400, "Failed to get image form Facebook link."
-
-    if _is_login_walled(
-        None,
-        None,
-        post_data.get("post_owner"),
-        post_data.get("description"),
-    ):
-        logger.warning("Facebook post is login-walled: url=%s", facebook_url)
-        return False, 403, "Facebook post is not accessible."
 
     title_text = f"### [{post_data['post_owner']}]({facebook_url})"
     author_text = post_data.get("post_author")
@@ -200,107 +344,112 @@ async def send_facebook_image(
     image_urls = post_data.get("images") or []
     downloaded_files = []
 
-    if image_urls:
-        for i, url in enumerate(image_urls):
-            image_bytes, filename = await download_image(session, url, FACEBOOK_CDN_HEADERS)
-            if image_bytes and filename:
-                unique_filename = f"{i}_{filename}"
-                downloaded_files.append((unique_filename, image_bytes))
-
-        if not downloaded_files:
-            logger.error(
-                "Facebook image download failed: url=%s image_urls=%s",
-                facebook_url,
-                len(image_urls),
-            )
-            return False, 400, "Failed to download any images."
-
-    logger.info(
-        "Sending Facebook image post: url=%s images=%s desc_len=%s total_text=%s",
-        facebook_url,
-        len(downloaded_files),
-        len(description_text),
-        len(header_text) + len(description_text),
-    )
-
-    components = ComponentV2Builder()
-    container = components.container(accent_color=0x1877F2)
-
-    container.text(title_text)
-    if author_text:
-        container.text(f"-# {author_text}")
-    container.text(description_text)
-
-    if downloaded_files:
-        container.separator()
-
-        gallery = container.gallery()
-        for filename, _ in downloaded_files:
-            gallery.media(f"attachment://{filename}")
-        gallery.end_gallery()
-
-    remaining_images = post_data.get("extra_images") or 0
-    if remaining_images > 0:
-        image_word = "image" if remaining_images == 1 else "images"
-        button_label = f"And more {remaining_images} {image_word} on Facebook"
-    else:
-        button_label = "View on Facebook"
-
-    action_row = container.action_row()
-    action_row.button(
-        style=5,
-        label=button_label,
-        url=facebook_url
-    )
-    action_row.end_action_row()
+    # ไฟล์รูปเป็นของฟังก์ชันนี้ตั้งแต่โหลดเสร็จ ต้องปิดเสมอ ไม่ว่าจะส่งสำเร็จ error หรือถูกยกเลิก
+    try:
+        if image_urls:
+            downloaded_files = await download_images(session, image_urls, FACEBOOK_CDN_HEADERS)
+
+            if not downloaded_files:
+                logger.error(
+                    "Facebook image download failed: url=%s image_urls=%s",
+                    facebook_url,
+                    len(image_urls),
+                )
+                return False, 400, "Failed to download any images."
+
+        logger.info(
+            "Sending Facebook image post: url=%s images=%s desc_len=%s total_text=%s",
+            facebook_url,
+            len(downloaded_files),
+            len(description_text),
+            len(header_text) + len(description_text),
+        )
 
-    container.end_container()
+        components = ComponentV2Builder()
+        container = components.container(accent_color=0x1877F2)
+
+        container.text(title_text)
+        if author_text:
+            container.text(f"-# {author_text}")
+        container.text(description_text)
+
+        if downloaded_files:
+            container.separator()
+
+            gallery = container.gallery()
+            for filename, _ in downloaded_files:
+                gallery.media(f"attachment://{filename}")
+            gallery.end_gallery()
+
+        remaining_images = post_data.get("extra_images") or 0
+        if remaining_images > 0:
+            image_word = "image" if remaining_images == 1 else "images"
+            button_label = f"And more {remaining_images} {image_word} on Facebook"
+        else:
+            button_label = "View on Facebook"
+
+        action_row = container.action_row()
+        action_row.button(
+            style=5,
+            label=button_label,
+            url=facebook_url
+        )
+        action_row.end_action_row()
 
-    payload = components.to_payload()
-    payload["content"] = ""
-    payload["allowed_mentions"] = NO_MENTIONS_PAYLOAD
+        container.end_container()
 
-    if downloaded_files:
-        form_data = aiohttp.FormData()
+        payload = components.to_payload()
+        payload["content"] = ""
+        payload["allowed_mentions"] = NO_MENTIONS_PAYLOAD
 
-        form_data.add_field(
-            'payload_json',
-            json.dumps(payload),
-            content_type='application/json'
-        )
+        if downloaded_files:
+            form_data = aiohttp.FormData()
 
-        for i, (filename, image_bytes) in enumerate(downloaded_files):
             form_data.add_field(
-                f'files[{i}]',
-                image_bytes,
-                filename=filename,
-                content_type='image/jpeg'
+                'payload_json',
+                json.dumps(payload),
+                content_type='application/json'
             )
 
-        async with session.patch(request_url, data=form_data, headers=headers) as resp:
+            for i, (filename, image_file) in enumerate(downloaded_files):
+                form_data.add_field(
+                    f'files[{i}]',
+                    image_file,
+                    filename=filename,
+                    content_type='image/jpeg'
+                )
+
+            async with session.patch(
+                request_url, data=form_data, headers=headers, timeout=DISCORD_REQUEST_TIMEOUT
+            ) as resp:
+                if resp.status in [200, 201]:
+                    return True, resp.status, ""
+                error_msg = await resp.text()
+                logger.error(
+                    "Discord API rejected Facebook image post: status=%s url=%s response=%s",
+                    resp.status,
+                    facebook_url,
+                    error_msg[:500],
+                )
+                return False, resp.status, error_msg
+
+        json_headers = {
+            **headers,
+            "Content-Type": "application/json",
+        }
+        async with session.patch(
+            request_url, json=payload, headers=json_headers, timeout=DISCORD_REQUEST_TIMEOUT
+        ) as resp:
             if resp.status in [200, 201]:
                 return True, resp.status, ""
             error_msg = await resp.text()
             logger.error(
-                "Discord API rejected Facebook image post: status=%s url=%s response=%s",
+                "Discord API rejected Facebook text post: status=%s url=%s response=%s",
                 resp.status,
                 facebook_url,
                 error_msg[:500],
             )
             return False, resp.status, error_msg
-
-    json_headers = {
-        **headers,
-        "Content-Type": "application/json",
-    }
-    async with session.patch(request_url, json=payload, headers=json_headers) as resp:
-        if resp.status in [200, 201]:
-            return True, resp.status, ""
-        error_msg = await resp.text()
-        logger.error(
-            "Discord API rejected Facebook text post: status=%s url=%s response=%s",
-            resp.status,
-            facebook_url,
-            error_msg[:500],
-        )
-        return False, resp.status, error_msg
+    finally:
+        for _, image_file in downloaded_files:
+            image_file.close()
@@ -0,0 +1,102 @@
+from typing import Dict, Literal, Optional, Set, Tuple
+
+import aiosqlite
+
+Scope = Literal["channel", "guild"]
+
+
+class ChannelSettings:
+    """In-memory view of the per-channel and per-guild settings in SQLite.
+
+    Everything is loaded once and updated in place on every toggle, so the
+    checks made for each message are set/dict lookups with no DB access.
+    Platform settings resolve channel override, then guild override, then
+    enabled by default.
+    """
+
+    def __init__(self, db: aiosqlite.Connection) -> None:
+        self.db = db
+        self.disabled_channels: Set[int] = set()
+        self._platforms: Dict[Tuple[Scope, int], Dict[str, bool]] = {}
+
+    async def setup(self) -> None:
+        async with self.db.cursor() as cursor:
+            await cursor.execute(
+                "CREATE TABLE IF NOT EXISTS channels (channel_id INTEGER PRIMARY KEY)"
+            )
+            await cursor.execute(
+                "CREATE TABLE IF NOT EXISTS platform_settings ("
+                "scope TEXT NOT NULL, scope_id INTEGER NOT NULL, platform TEXT NOT NULL, "
+                "enabled INTEGER NOT NULL, PRIMARY KEY (scope, scope_id, platform))"
+            )
+        await self.db.commit()
+        await self.load()
+
+    async def load(self) -> None:
+        async with self.db.execute("SELECT channel_id FROM channels") as cursor:
+            self.disabled_channels = {row[0] for row in await cursor.fetchall()}
+
+        platforms: Dict[Tuple[Scope, int], Dict[str, bool]] = {}
+        async with self.db.execute(
+            "SELECT scope, scope_id, platform, enabled FROM platform_settings"
+        ) as cursor:
+            for scope, scope_id, platform, enabled in await cursor.fetchall():
+                platforms.setdefault((scope, scope_id), {})[platform] = bool(enabled)
+        self._platforms = platforms
+
+    def is_channel_enabled(self, channel_id: int) -> bool:
+        return channel_id not in self.disabled_channels
+
+    def is_platform_enabled(self, platform: str, channel_id: int, guild_id: Optional[int]) -> bool:
+        channel_value = self._platforms.get(("channel", channel_id), {}).get(platform)
+        if channel_value is not None:
+            return channel_value
+        if guild_id is not None:
+            guild_value = self._platforms.get(("guild", guild_id), {}).get(platform)
+            if guild_value is not None:
+                return guild_value
+        return True
+
+    async def set_channel_enabled(self, channel_id: int, enabled: bool) -> None:
+        async with self.db.cursor() as cursor:
+            if enabled:
+                await cursor.execute("DELETE FROM channels WHERE channel_id = ?", (channel_id,))
+            else:
+                await cursor.execute(
+                    "INSERT OR IGNORE INTO channels (channel_id) VALUES (?)", (channel_id,)
+                )
+        await self.db.commit()
+        if enabled:
+            self.disabled_channels.discard(channel_id)
+        else:
+            self.disabled_channels.add(channel_id)
+
+    async def set_platform_enabled(
+        self,
+        scope: Scope,
+        scope_id: int,
+        platform: str,
+        enabled: Optional[bool],
+    ) -> None:
+        """Sets a platform on/off for a channel or guild; None clears the override."""
+        async with self.db.cursor() as cursor:
+            if enabled is None:
+                await cursor.execute(
+                    "DELETE FROM platform_settings WHERE scope = ? AND scope_id = ? AND platform = ?",
+                    (scope, scope_id, platform),
+                )
+            else:
+                await cursor.execute(
+                    "INSERT OR REPLACE INTO platform_settings (scope, scope_id, platform, enabled) "
+                    "VALUES (?, ?, ?, ?)",
+                    (scope, scope_id, platform, int(enabled)),
+                )
+        await self.db.commit()
+
+        overrides = self._platforms.setdefault((scope, scope_id), {})
+        if enabled is None:
+            overrides.pop(platform, None)
+            if not overrides:
+                del self._platforms[(scope, scope_id)]
+        else:
+            overrides[platform] = enabled
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that resolve the same thing.
+
+    The first caller for a key starts the call as a task; callers arriving
+    with the same key while it runs wait for that task instead of starting
+    their own, and all of them get its result or its exception. The key is
+    forgotten as soon as the call finishes, so nothing is cached here.
+
+    A waiter that is cancelled stops waiting without cancelling the shared
+    call, which the other waiters may still need.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # every waiter may have been cancelled; mark the error as retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+# Post resolutions shared by every message, keyed by links.post_cache_key()
+resolution_flights = SingleFlight()
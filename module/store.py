@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from logging import Logger
+from typing import Any, Dict, Optional, Tuple
+
+import aiosqlite
+
+logger: Logger = logging.getLogger("discord")
+
+
+class ResolutionStore:
+    """Persistent cache of resolved media in the bot's SQLite database.
+
+    Values are stored as zlib-compressed JSON with an expiry timestamp.
+    Writes are buffered in memory and flushed in batches by a background
+    task, which also prunes expired rows, so the message path only ever
+    waits on reads.
+    """
+
+    def __init__(
+        self,
+        db: aiosqlite.Connection,
+        flush_interval: float = 2.0,
+        prune_interval: float = 600.0,
+    ) -> None:
+        self.db = db
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self._pending: Dict[str, Tuple[Any, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._last_prune = 0.0
+
+    async def setup(self) -> None:
+        async with self.db.cursor() as cursor:
+            await cursor.execute(
+                "CREATE TABLE IF NOT EXISTS resolutions ("
+                "cache_key TEXT PRIMARY KEY, payload BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            await cursor.execute(
+                "CREATE INDEX IF NOT EXISTS resolutions_expires_at ON resolutions (expires_at)"
+            )
+        await self.db.commit()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Returns (value, expires_at) for a live entry, or None."""
+        pending = self._pending.get(key)
+        if pending is not None and pending[1] > time.time():
+            return pending
+
+        async with self.db.execute(
+            "SELECT payload, expires_at FROM resolutions WHERE cache_key = ? AND expires_at > ?",
+            (key, time.time()),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0])), row[1]
+        except (zlib.error, ValueError):
+            logger.warning("Dropping unreadable cache row: key=%s", key)
+            return None
+
+    def put(self, key: str, value: Any, expires_at: float) -> None:
+        self._pending[key] = (value, expires_at)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        rows = [
+            (key, zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8")), expires_at)
+            for key, (value, expires_at) in batch.items()
+        ]
+        try:
+            await self.db.executemany(
+                "INSERT OR REPLACE INTO resolutions (cache_key, payload, expires_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            await self.db.commit()
+        except BaseException:
+            # keep the batch for the next flush (also when cancelled), newer writes win
+            self._pending = {**batch, **self._pending}
+            raise
+
+    async def prune(self) -> None:
+        await self.db.execute("DELETE FROM resolutions WHERE expires_at <= ?", (time.time(),))
+        await self.db.commit()
+        self._last_prune = time.monotonic()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_prune >= self.prune_interval:
+                    await self.prune()
+            except Exception:
+                logger.error("Resolution store maintenance failed", exc_info=True)
+
+    async def close(self) -> None:
+        # let the loop finish a flush in progress instead of cancelling it midway
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
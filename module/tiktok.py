@@ -1,44 +1,111 @@
 # form https://github.com/devfemibadmus/webmedia
 
+import asyncio
+import re
 import requests, json
 from bs4 import BeautifulSoup
 
+from .html_stream import read_scripts
+
+REHYDRATION_SCRIPT_ID = '__UNIVERSAL_DATA_FOR_REHYDRATION__'
+# หา script ข้อมูลด้วย regex ตรง ๆ แทนการสร้าง BeautifulSoup ทั้งหน้า
+_REHYDRATION_SCRIPT = re.compile(
+    r'<script\b[^>]*?\bid\s*=\s*(["\']?)' + REHYDRATION_SCRIPT_ID + r'\1[^>]*>(.*?)</script\s*>',
+    re.DOTALL | re.IGNORECASE,
+)
+
+def _as_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def select_video_quality(videos, max_bytes=None):
+    """เลือก encode ที่ดีที่สุดที่ขนาดไม่เกิน max_bytes จาก getData()['videos']
+
+    เรียงตาม bitrate แล้วตามขนาด ถ้าไม่มีตัวไหนอยู่ในงบให้เอาตัวที่เล็กที่สุด
+    ถ้าไม่รู้ขนาดเลยให้ใช้ตัวแรกเหมือนเดิม คืนค่า dict ที่มี size/bitrate/address
+    ตัวที่ไม่มี URL จริง (address เป็น 'N/A') จะไม่ถูกเลือก ถ้าไม่เหลือเลยคืน None
+    """
+    qualities = [
+        quality for entry in videos for quality in entry.values()
+        if str(quality.get('address', '')).startswith(('http://', 'https://'))
+    ]
+    if not qualities:
+        return None
+    sized = [quality for quality in qualities if _as_number(quality.get('size')) is not None]
+    if max_bytes is None or not sized:
+        return qualities[0]
+
+    def rank(quality):
+        return (_as_number(quality.get('bitrate')) or 0, _as_number(quality['size']))
+
+    fitting = [quality for quality in sized if _as_number(quality['size']) <= max_bytes]
+    if fitting:
+        return max(fitting, key=rank)
+    return min(sized, key=lambda quality: _as_number(quality['size']))
+
+
 class TikTokv2:
     def __init__(self, url, cut=None):
         print(url)
+        self._setup(url, cut)
+        self.data, self.status = self.fetch_and_process()
+        self._load_item()
+
+    def _setup(self, url, cut):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
             'Referer': 'https://www.tiktok.com/'
         }
         self.url, self.cut = url.replace('/photo', '/video'), cut
         self.error, self.status, self.json_data = None, None, None
-        self.data, self.status = self.fetch_and_process()
+
+    def _load_item(self):
         try:
             self.item = self.data['itemInfo']['itemStruct']
             self.data['statusMsg'] == "ok"
         except Exception as e:
-            self.error, self.status = {'error': True, 'message': 'something went wrong', 'error_message': 'unable to get item from itemStruct'}, 502
-    
+            if not self.error:
+                self.error, self.status = {'error': True, 'message': 'something went wrong', 'error_message': 'unable to get item from itemStruct'}, 502
+
     def fetch_and_process(self):
         if 'vm.tiktok.com' in self.url:
             response = requests.get(self.url)
             self.url = response.url
         response = requests.get(self.url, headers=self.headers)
-        if response.status_code != 200:
-            self.error, self.status = {'error': True, 'message': 'unable to process url', 'error_message': f'Failed to fetch page content: {response.status_code}'}, 502
-        html_content = response.text
+        return self.process_html(response.status_code, response.text)
+
+    def process_html(self, status_code, html_content):
+        if status_code != 200:
+            self.error, self.status = {'error': True, 'message': 'unable to process url', 'error_message': f'Failed to fetch page content: {status_code}'}, 502
+            return None, self.status
+        match = _REHYDRATION_SCRIPT.search(html_content)
+        if match and match.group(2).strip():
+            return self.process_script(match.group(2))
+        # fast path ไม่เจอ ให้ BeautifulSoup จัดการ markup แปลก ๆ และรายงานว่าขาดอะไร
+        return self._process_html_with_soup(html_content)
+
+    def _process_html_with_soup(self, html_content):
         soup = BeautifulSoup(html_content, 'html.parser')
         body_content = soup.find('body')
         if body_content is None:
             self.error, self.status = {'error': True, 'message': 'something went wrong', 'error_message': 'No <body> tag found.'}, 502
-        script_tag = body_content.find('script', {'id': '__UNIVERSAL_DATA_FOR_REHYDRATION__'})
-        if script_tag is None:
+            return None, self.status
+        script_tag = body_content.find('script', {'id': REHYDRATION_SCRIPT_ID})
+        return self.process_script(script_tag.string if script_tag is not None else None)
+
+    def process_script(self, script_string):
+        if script_string is None:
             self.error, self.status = {'error': True, 'message': 'something went wrong', 'error_message': 'No <script> tag with ID \'__UNIVERSAL_DATA_FOR_REHYDRATION__\' found.'}, 502
-        script_content = script_tag.string.strip()
+            return None, self.status
+        script_content = script_string.strip()
         try:
             self.json_data = json.loads(script_content)
         except json.JSONDecodeError:
             self.error, self.status = {'error': True, 'message': 'something went wrong', 'error_message': 'The content of the script tag is not valid JSON.'}, 502
+            return None, self.status
         try:
             self.json_data = self.json_data['__DEFAULT_SCOPE__']['webapp.video-detail']
         except KeyError:
@@ -89,6 +156,7 @@ class TikTokv2:
                     video_info['videos'].append({
                         key: {
                             'size': quality_type['PlayAddr'].get('DataSize', 'N/A'),
+                            'bitrate': quality_type.get('Bitrate', 'N/A'),
                             'address': (quality_type['PlayAddr']['UrlList'][-1] if 'UrlList' in quality_type['PlayAddr'] else 'N/A').replace('https://www.tiktok.com', 'https://api16-normal-useast5.tiktokv.us'),
                         }
                     })
@@ -140,6 +208,39 @@ class TikTokv2:
             except Exception as e:
                 return {'error': True, 'message': 'something went wrong', 'error_message': str(e)}, 500
 
+class TikTokAsync(TikTokv2):
+    """TikTokv2 ที่ดึงหน้าเว็บผ่าน aiohttp session ที่ใช้ร่วมกัน ไม่บล็อก event loop
+
+    ใช้งาน: data, status = (await TikTokAsync(url, session, cut=True).load()).getData()
+    """
+    def __init__(self, url, session, cut=None):
+        self._setup(url, cut)
+        self.session = session
+        self.data, self.item = None, None
+        # HTTP status ของหน้าโพสต์ (None ถ้ายังไม่ได้ response) ไว้แยกว่าแพลตฟอร์มล่มหรือแค่หาโพสต์ไม่เจอ
+        # ส่วน network error จะถูก raise ออกไปตรง ๆ จาก load()
+        self.page_status = None
+
+    async def load(self):
+        if 'vm.tiktok.com' in self.url:
+            # ตามแค่ redirect เพื่อเอา URL จริง ไม่ต้องอ่าน body
+            async with self.session.get(self.url, allow_redirects=True) as response:
+                self.url = str(response.url)
+        # อ่านหน้าเว็บทีละ chunk แล้วหยุดทันทีที่ได้ script ข้อมูลครบ ไม่ต้องโหลดทั้งหน้า
+        async with self.session.get(self.url, headers=self.headers) as response:
+            status_code, page = response.status, None
+            self.page_status = status_code
+            if status_code == 200:
+                page = await read_scripts(response, {'id': REHYDRATION_SCRIPT_ID}, until=bool)
+        if page is not None and page.scripts:
+            self.data, self.status = await asyncio.to_thread(self.process_script, page.scripts[0] or None)
+        else:
+            # ไม่เจอ script ระหว่างสตรีม ให้ process_html ตรวจทั้งหน้าและรายงาน error เหมือนเดิม
+            html_content = page.html if page is not None else ''
+            self.data, self.status = await asyncio.to_thread(self.process_html, status_code, html_content)
+        self._load_item()
+        return self
+
 class TikTokv1:
     def __init__(self, item_id, cut=None):
         self.cut = cut
@@ -0,0 +1,70 @@
+import json
+import re
+from typing import Dict, List, Literal, Optional
+
+Direction = Literal["en_th", "th_en"]
+
+# Spans that must be copied as-is: Discord syntax (<@123>, <:emoji:123>,
+# <t:123>, </command:123>), code blocks and URLs
+_PROTECTED_PATTERN = re.compile(
+    r"<[a-z]?@?&?!?#?\d+>|<[a-z]?:[a-zA-Z0-9_]+:\d+>|<t:\d+(?::[tTdDfFR])?>|</[a-zA-Z0-9_-]+:\d+>"
+    r"|```.*?```|`.*?`"
+    r"|https?://[^\s<>]+",
+    re.DOTALL,
+)
+# Deletion tables used to count characters with str.translate
+_DROP_THAI = dict.fromkeys(range(0x0E00, 0x0E80))
+_DROP_LATIN = dict.fromkeys([*range(ord("A"), ord("Z") + 1), *range(ord("a"), ord("z") + 1)])
+
+
+class Transliterator:
+    """Converts text typed with the wrong keyboard layout (EN <-> TH Kedmanee).
+
+    Both translation tables are built once from the keyboard map, so
+    translating is a single C-level str.translate per plain-text span.
+    """
+
+    def __init__(self, en_to_th: Dict[str, str]) -> None:
+        # ordinal -> ordinal tables are the fastest mapping str.translate accepts
+        self._tables = {
+            "en_th": {ord(en): ord(th) for en, th in en_to_th.items()},
+            "th_en": {ord(th): ord(en) for en, th in en_to_th.items()},
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "Transliterator":
+        with open(file=path, mode="r", encoding="utf-8") as f:
+            return cls(json.load(fp=f))
+
+    @staticmethod
+    def detect_direction(text: str) -> Direction:
+        """Guesses the direction: text that is mostly Thai was meant to be English."""
+        thai = len(text) - len(text.translate(_DROP_THAI))
+        latin = len(text) - len(text.translate(_DROP_LATIN))
+        return "th_en" if thai > latin else "en_th"
+
+    def translate(self, text: str, direction: Direction = "en_th") -> str:
+        return text.translate(self._tables[direction])
+
+    def translate_preserving_syntax(self, text: str, direction: Optional[Direction] = None) -> str:
+        """Translates plain text and leaves Discord syntax, code and URLs untouched.
+
+        The direction is detected from the plain text only when not given, so
+        a link or mention never outweighs a short mistyped message.
+        """
+        plain: List[str] = []
+        protected: List[str] = []
+        last_end = 0
+        for match in _PROTECTED_PATTERN.finditer(text):
+            plain.append(text[last_end:match.start()])
+            protected.append(match.group(0))
+            last_end = match.end()
+        plain.append(text[last_end:])
+
+        table = self._tables[direction or self.detect_direction("".join(plain))]
+        parts: List[str] = []
+        for segment, kept in zip(plain, protected):
+            parts.append(segment.translate(table))
+            parts.append(kept)
+        parts.append(plain[-1].translate(table))
+        return "".join(parts)
@@ -1,24 +1,106 @@
+import asyncio
 import json
 import os
+import random
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 
-def json_append(data, file, indent=4, ensure_ascii=False, max_items=None):
-    try:
-        # โหลดข้อมูลเก่าถ้ามี
-        existing = json.load(open(file, encoding='utf-8')) if os.path.exists(file) else []
-    except Exception:
-        existing = []
+class DebugRecorder:
+    """Samples debug items and appends them to a JSONL file.
 
-    # ถ้าไม่ใช่ list ให้ wrap เป็น list
-    if not isinstance(existing, list):
-        existing = [existing]
+    record() only appends to a bounded in-memory queue; a background task
+    writes the pending items in a worker thread and rotates the file once it
+    grows past max_bytes (file -> file.1 -> ... -> file.<backups>).
+    """
 
-    existing.append(data)
+    def __init__(
+        self,
+        file: str,
+        capacity: int = 50,
+        sample_rate: float = 1.0,
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 2,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.file = file
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        # ถ้าเขียนไฟล์ไม่ทัน ให้ทิ้งของเก่าแทนการกินหน่วยความจำเพิ่ม
+        self._pending: Deque[Any] = deque(maxlen=capacity * 4)
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.dropped = 0
 
-    # หากกำหนด max_items ให้ตัดข้อมูลให้อยู่ภายในขนาดที่กำหนด
-    if max_items is not None:
-        existing = existing[-max_items:]
+    def record(self, item: Any) -> None:
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self.recorded += 1
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(item)
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # ไม่มี event loop (เช่นรันสคริปต์ทดสอบ) ให้ close() เป็นคนเขียน
+                pass
 
-    # เขียนกลับลงไฟล์
-    with open(file, 'w', encoding='utf-8') as f:
-        json.dump(existing, f, indent=indent, ensure_ascii=ensure_ascii)
\ No newline at end of file
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch = list(self._pending)
+        self._pending.clear()
+        await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch: List[Any]) -> None:
+        lines = "".join(
+            json.dumps(item, ensure_ascii=False, default=str) + "\n" for item in batch
+        )
+        try:
+            if os.path.getsize(self.file) >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            pass
+        with open(self.file, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.file}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.file, f"{self.file}.1")
+        else:
+            os.remove(self.file)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recorded": self.recorded,
+            "pending": len(self._pending),
+            "dropped": self.dropped,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+DEBUG_SAMPLE_RATE = float(os.environ.get("DEBUG_SAMPLE_RATE", 1.0))
+
+video_debug = DebugRecorder("debug.jsonl", capacity=50, sample_rate=DEBUG_SAMPLE_RATE)
+image_debug = DebugRecorder("debug_image.jsonl", capacity=20, sample_rate=DEBUG_SAMPLE_RATE)
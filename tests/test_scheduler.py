@@ -0,0 +1,92 @@
+import asyncio
+from typing import List
+
+from module.scheduler import LinkScheduler
+
+
+async def _hold(scheduler: LinkScheduler, guild: str, priority: str, order: List[str], name: str) -> None:
+    async with scheduler.slot(guild, priority):
+        order.append(name)
+        await asyncio.sleep(0)
+
+
+async def _queue_behind_blocker(scheduler: LinkScheduler, jobs: List[tuple]) -> List[str]:
+    """Queues jobs while the only slot is held, then lets them run one by one."""
+    order: List[str] = []
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot("blocker", "mirror"):
+            await release.wait()
+
+    blocking = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = []
+    for guild, priority, name in jobs:
+        tasks.append(asyncio.create_task(_hold(scheduler, guild, priority, order, name)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(blocking, *tasks)
+    return order
+
+
+def test_cheaper_classes_are_served_first() -> None:
+    async def main() -> List[str]:
+        scheduler = LinkScheduler(workers=1)
+        return await _queue_behind_blocker(scheduler, [
+            ("a", "gallery", "gallery"),
+            ("b", "video", "video"),
+            ("c", "mirror", "mirror"),
+        ])
+
+    assert asyncio.run(main()) == ["mirror", "video", "gallery"]
+
+
+def test_guilds_take_turns_within_a_class() -> None:
+    async def main() -> List[str]:
+        scheduler = LinkScheduler(workers=1)
+        return await _queue_behind_blocker(scheduler, [
+            ("spam", "gallery", "spam0"),
+            ("spam", "gallery", "spam1"),
+            ("spam", "gallery", "spam2"),
+            ("other", "gallery", "other0"),
+        ])
+
+    assert asyncio.run(main()) == ["spam0", "other0", "spam1", "spam2"]
+
+
+def test_overdue_heavy_class_is_promoted() -> None:
+    async def main() -> tuple:
+        scheduler = LinkScheduler(workers=1, max_wait=0)
+        order = await _queue_behind_blocker(scheduler, [
+            ("a", "gallery", "gallery"),
+            ("b", "mirror", "mirror"),
+        ])
+        return order, scheduler.promoted
+
+    order, promoted = asyncio.run(main())
+    assert order == ["gallery", "mirror"]
+    assert promoted == 1
+
+
+def test_cancelled_during_handover_passes_the_slot_on() -> None:
+    async def main() -> tuple:
+        scheduler = LinkScheduler(workers=1)
+        order: List[str] = []
+        held = scheduler.slot("a", "mirror")
+        await held.__aenter__()
+        first = asyncio.create_task(_hold(scheduler, "b", "mirror", order, "first"))
+        second = asyncio.create_task(_hold(scheduler, "c", "mirror", order, "second"))
+        await asyncio.sleep(0)
+
+        # hands the slot to first, which is cancelled before it gets to resume
+        await held.__aexit__(None, None, None)
+        first.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        return order, first.cancelled(), scheduler.stats()
+
+    order, cancelled, stats = asyncio.run(main())
+    assert cancelled
+    assert order == ["second"]
+    assert stats["running"] == 0
+    assert stats["queued"] == {"mirror": 0, "video": 0, "gallery": 0}
@@ -0,0 +1,23 @@
+from module.tiktok import select_video_quality
+
+
+def test_skips_qualities_without_an_address() -> None:
+    videos = [
+        {"quality_0": {"size": 900, "bitrate": 500, "address": "N/A"}},
+        {"quality_1": {"size": 2000, "bitrate": 800, "address": "https://x"}},
+    ]
+    assert select_video_quality(videos, max_bytes=1000)["address"] == "https://x"
+
+
+def test_returns_none_when_no_quality_has_an_address() -> None:
+    videos = [{"quality_0": {"size": 900, "bitrate": 500, "address": "N/A"}}]
+    assert select_video_quality(videos, max_bytes=1000) is None
+
+
+def test_picks_the_best_quality_within_the_budget() -> None:
+    videos = [
+        {"quality_0": {"size": "20000000", "bitrate": 2000000, "address": "https://a"}},
+        {"quality_1": {"size": 8000000, "bitrate": 1200000, "address": "https://b"}},
+        {"quality_2": {"size": 5000000, "bitrate": 800000, "address": "https://c"}},
+    ]
+    assert select_video_quality(videos, max_bytes=10 * 1024 * 1024)["address"] == "https://b"
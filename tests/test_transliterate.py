@@ -0,0 +1,17 @@
+import os
+
+from module.transliterate import Transliterator
+
+KEYBOARD_MAP = os.path.join(os.path.dirname(__file__), "..", "module", "keyboard_map.json")
+keyboard = Transliterator.from_file(KEYBOARD_MAP)
+
+
+def test_mistyped_thai_with_link_is_translated_and_link_is_kept() -> None:
+    url = "https://www.tiktok.com/@someone/video/7301234567890123456"
+    translated = keyboard.translate_preserving_syntax(f"้ำสสน {url}")
+    assert translated == f"hello {url}"
+
+
+def test_mistyped_english_with_mention_and_code() -> None:
+    text = "l;ylfu <@123456789> `code`"
+    assert keyboard.translate_preserving_syntax(text) == "สวัสดี <@123456789> `code`"